@@ -16,7 +16,7 @@ ws://localhost:8200/ws/monitor
 | `gpu_stats` | 2 сек | Статистика GPU и VRAM |
 | `task.queued` | по событию | Задача добавлена в очередь |
 | `task.started` | по событию | Задача начала выполнение |
-| `task.progress` | 500 мс | Прогресс генерации (streaming) |
+| `task.progress` | не чаще 100 мс на задачу | Прогресс генерации (streaming) |
 | `task.completed` | по событию | Задача успешно завершена |
 | `task.failed` | по событию | Задача завершена с ошибкой |
 | `model.loaded` | по событию | Модель загружена в VRAM |
@@ -58,13 +58,26 @@ ws://localhost:8200/ws/monitor
     "timestamp": 1234567890.123,
     "data": {
         "task_id": "task_abc123",
-        "model": "gpt-4-turbo",
         "tokens_used": 150,
         "duration_ms": 3500
     }
 }
 ```
 
+События `task.*` содержат только новые поля (дельты), полное состояние
+задачи не пересылается повторно:
+
+| Событие | Поля `data` |
+|---------|-------------|
+| `task.queued` | `task_id`, `model`, `priority` |
+| `task.started` | `task_id`, `model` |
+| `task.progress` | `task_id`, `tokens_generated`, `partial_text` (опционально) |
+| `task.completed` | `task_id`, `tokens_used`, `duration_ms` |
+| `task.failed` | `task_id`, `error` |
+
+Клиент должен хранить состояние задач локально по `task_id` и применять
+к нему приходящие дельты.
+
 ## Wildcard подписки
 
 - `*` — все события
@@ -1,11 +1,10 @@
 """Embeddings API Routes для SOP LLM Executor.
 
 Endpoints для генерации векторных представлений текстов.
-Используют EmbeddingManager с lazy loading и FIFO eviction.
+Используют EmbeddingManager с lazy loading и LRU eviction (разовые модели вытесняются первыми).
 """
 
-import math
-
+import numpy as np
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
@@ -67,7 +66,7 @@ async def generate_embeddings(request: EmbeddingRequest) -> EmbeddingResponse:
     """Сгенерировать embeddings для текстов.
 
     Модель загружается автоматически при первом запросе (lazy loading).
-    При нехватке VRAM выполняется FIFO eviction старых моделей.
+    При нехватке VRAM сначала выгружаются модели без повторных обращений, затем давно не использованные.
 
     Args:
         request: Параметры запроса (texts, model_name)
@@ -138,14 +137,13 @@ def _cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     if len(vec1) != len(vec2):
         raise ValueError("Векторы должны иметь одинаковую размерность")
 
-    dot_product = sum(a * b for a, b in zip(vec1, vec2, strict=False))
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
-
-    if magnitude1 == 0 or magnitude2 == 0:
+    v1 = np.asarray(vec1, dtype=np.float64)
+    v2 = np.asarray(vec2, dtype=np.float64)
+    norm_product = np.linalg.norm(v1) * np.linalg.norm(v2)
+    if norm_product == 0:
         return 0.0
 
-    similarity = dot_product / (magnitude1 * magnitude2)
+    similarity = float(np.clip(v1 @ v2 / norm_product, -1.0, 1.0))
     return (similarity + 1) / 2
 
 
@@ -22,6 +22,11 @@ logger = get_logger(__name__)
 
 router = APIRouter(tags=["websocket"])
 
+# Минимальный интервал между task.progress без partial_text для одной задачи
+TASK_PROGRESS_MIN_INTERVAL = 0.1
+# Отметки task.progress старше этого возраста (сек) удаляются
+TASK_PROGRESS_STALE_AFTER = 300.0
+
 
 class ConnectionManager:
     """Менеджер WebSocket соединений.
@@ -35,6 +40,8 @@ class ConnectionManager:
         self.subscriptions: dict[str, set[str]] = {}
         self.task_filters: dict[str, str | None] = {}
         self._lock = asyncio.Lock()
+        # Время последнего task.progress по задаче; порядок вставки = давность
+        self._last_progress_sent: dict[str, float] = {}
 
     async def connect(self, websocket: WebSocket, connection_id: str) -> None:
         """Принять новое соединение.
@@ -50,7 +57,7 @@ class ConnectionManager:
             self.subscriptions[connection_id] = {"*"}
             self.task_filters[connection_id] = None
 
-        logger.info("WebSocket подключен", connection_id=connection_id)
+        logger.debug("WebSocket подключен", connection_id=connection_id)
 
     async def disconnect(self, connection_id: str) -> None:
         """Отключить соединение.
@@ -64,7 +71,7 @@ class ConnectionManager:
             self.subscriptions.pop(connection_id, None)
             self.task_filters.pop(connection_id, None)
 
-        logger.info("WebSocket отключен", connection_id=connection_id)
+        logger.debug("WebSocket отключен", connection_id=connection_id)
 
     async def subscribe(self, connection_id: str, events: list[str]) -> None:
         """Подписаться на события.
@@ -144,23 +151,35 @@ class ConnectionManager:
             data: Данные события
             task_id: ID задачи (для фильтрации)
 
-        """
-        message = orjson.dumps({
-            "type": event_type,
-            "timestamp": time.time(),
-            "data": data,
-        }).decode("utf-8")
+        Note:
+            Сообщение сериализуется один раз и только если есть хотя бы
+            один получатель; всем подписчикам уходит одна и та же строка.
 
+        """
         async with self._lock:
+            recipients = [
+                (connection_id, websocket)
+                for connection_id, websocket in self.active_connections.items()
+                if self._should_send(connection_id, event_type, task_id)
+            ]
+            if not recipients:
+                return
+
+            message = orjson.dumps({
+                "type": event_type,
+                "timestamp": time.time(),
+                "data": data,
+            }).decode("utf-8")
+
             connections_to_remove = []
 
-            for connection_id, websocket in self.active_connections.items():
-                if not self._should_send(connection_id, event_type, task_id):
+            for connection_id, websocket in recipients:
+                if websocket.client_state != WebSocketState.CONNECTED:
+                    connections_to_remove.append(connection_id)
                     continue
 
                 try:
-                    if websocket.client_state == WebSocketState.CONNECTED:
-                        await websocket.send_text(message)
+                    await websocket.send_text(message)
                 except Exception as e:
                     logger.warning(
                         "Ошибка отправки WebSocket сообщения",
@@ -194,27 +213,89 @@ class ConnectionManager:
                         error=str(e),
                     )
 
+    def should_send_progress(self, task_id: str, now: float) -> bool:
+        """Проверить, можно ли отправить task.progress без partial_text.
+
+        Отметки старше TASK_PROGRESS_STALE_AFTER удаляются, поэтому задачи,
+        завершившиеся без task.completed/task.failed (отмена, потеря), не
+        накапливаются в памяти.
+
+        Args:
+            task_id: ID задачи
+            now: Текущее время time.monotonic()
+
+        Returns:
+            True если с прошлого события прошло не меньше TASK_PROGRESS_MIN_INTERVAL
+
+        """
+        last = self._last_progress_sent.get(task_id)
+        if last is not None and now - last < TASK_PROGRESS_MIN_INTERVAL:
+            return False
+
+        self.mark_progress_sent(task_id, now)
+        return True
+
+    def mark_progress_sent(self, task_id: str, now: float) -> None:
+        """Запомнить время отправки task.progress и удалить устаревшие отметки.
+
+        Args:
+            task_id: ID задачи
+            now: Текущее время time.monotonic()
+
+        """
+        self._last_progress_sent.pop(task_id, None)
+        self._last_progress_sent[task_id] = now
+
+        stale_before = now - TASK_PROGRESS_STALE_AFTER
+        for stale_id, sent_at in list(self._last_progress_sent.items()):
+            if sent_at >= stale_before:
+                break
+            del self._last_progress_sent[stale_id]
+
+    def forget_task_progress(self, task_id: str) -> None:
+        """Удалить отметку task.progress для завершённой задачи.
+
+        Args:
+            task_id: ID задачи
+
+        """
+        self._last_progress_sent.pop(task_id, None)
+
     @property
     def connection_count(self) -> int:
         """Количество активных соединений."""
         return len(self.active_connections)
 
 
-manager = ConnectionManager()
+_connection_manager: ConnectionManager | None = None
 
 
 def get_connection_manager() -> ConnectionManager:
     """Получить глобальный менеджер соединений.
 
+    Менеджер создаётся при первом обращении, а не при импорте модуля.
+
     Returns:
         ConnectionManager instance
 
     """
-    return manager
+    global _connection_manager
+    if _connection_manager is None:
+        _connection_manager = ConnectionManager()
+    return _connection_manager
+
+
+def __getattr__(name: str) -> Any:
+    """Ленивый доступ к устаревшему атрибуту модуля `manager`."""
+    if name == "manager":
+        return get_connection_manager()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 async def gpu_stats_broadcaster() -> None:
     """Фоновая задача для рассылки GPU статистики каждые 2 секунды."""
+    manager = get_connection_manager()
     while True:
         try:
             if manager.connection_count > 0:
@@ -282,9 +363,13 @@ async def websocket_monitor(websocket: WebSocket) -> None:
         - gpu_stats: {"type": "gpu_stats", "timestamp": ..., "data": {...}}
         - task.*: {"type": "task.queued", "timestamp": ..., "data": {...}}
         - pong: {"type": "pong", "timestamp": ...}
+
+    task.* события передают только изменившиеся поля (дельты);
+    клиент хранит состояние задачи локально по task_id.
     """
     import uuid
     connection_id = str(uuid.uuid4())
+    manager = get_connection_manager()
 
     await manager.connect(websocket, connection_id)
     await start_broadcaster()
@@ -365,7 +450,7 @@ async def websocket_monitor(websocket: WebSocket) -> None:
                 })
 
     except WebSocketDisconnect:
-        logger.info("WebSocket клиент отключился", connection_id=connection_id)
+        logger.debug("WebSocket клиент отключился", connection_id=connection_id)
     except Exception as e:
         logger.exception("Ошибка WebSocket", connection_id=connection_id, error=str(e))
     finally:
@@ -381,7 +466,7 @@ async def broadcast_task_queued(task_id: str, model: str, priority: float) -> No
         priority: Приоритет задачи
 
     """
-    await manager.broadcast(
+    await get_connection_manager().broadcast(
         "task.queued",
         {"task_id": task_id, "model": model, "priority": priority},
         task_id=task_id,
@@ -396,7 +481,7 @@ async def broadcast_task_started(task_id: str, model: str) -> None:
         model: Название модели
 
     """
-    await manager.broadcast(
+    await get_connection_manager().broadcast(
         "task.started",
         {"task_id": task_id, "model": model},
         task_id=task_id,
@@ -410,12 +495,24 @@ async def broadcast_task_progress(
 ) -> None:
     """Разослать событие о прогрессе генерации.
 
+    События только со счётчиком токенов рассылаются не чаще одного раза
+    в TASK_PROGRESS_MIN_INTERVAL секунд на задачу: следующее событие всё
+    равно содержит актуальное значение. События с partial_text не
+    отбрасываются.
+
     Args:
         task_id: ID задачи
         tokens_generated: Количество сгенерированных токенов
         partial_text: Частичный текст (для streaming)
 
     """
+    manager = get_connection_manager()
+    now = time.monotonic()
+    if partial_text is not None:
+        manager.mark_progress_sent(task_id, now)
+    elif not manager.should_send_progress(task_id, now):
+        return
+
     data: dict[str, Any] = {
         "task_id": task_id,
         "tokens_generated": tokens_generated,
@@ -428,24 +525,25 @@ async def broadcast_task_progress(
 
 async def broadcast_task_completed(
     task_id: str,
-    model: str,
     tokens_used: int,
     duration_ms: float,
 ) -> None:
     """Разослать событие о завершении задачи.
 
+    Содержит только новые поля; модель уже пришла в task.queued/task.started.
+
     Args:
         task_id: ID задачи
-        model: Название модели
         tokens_used: Использовано токенов
         duration_ms: Время выполнения в мс
 
     """
+    manager = get_connection_manager()
+    manager.forget_task_progress(task_id)
     await manager.broadcast(
         "task.completed",
         {
             "task_id": task_id,
-            "model": model,
             "tokens_used": tokens_used,
             "duration_ms": duration_ms,
         },
@@ -453,18 +551,21 @@ async def broadcast_task_completed(
     )
 
 
-async def broadcast_task_failed(task_id: str, model: str, error: str) -> None:
+async def broadcast_task_failed(task_id: str, error: str) -> None:
     """Разослать событие об ошибке задачи.
 
+    Содержит только новые поля; модель уже пришла в task.queued/task.started.
+
     Args:
         task_id: ID задачи
-        model: Название модели
         error: Сообщение об ошибке
 
     """
+    manager = get_connection_manager()
+    manager.forget_task_progress(task_id)
     await manager.broadcast(
         "task.failed",
-        {"task_id": task_id, "model": model, "error": error},
+        {"task_id": task_id, "error": error},
         task_id=task_id,
     )
 
@@ -477,7 +578,7 @@ async def broadcast_model_loaded(model_name: str, vram_used_mb: int) -> None:
         vram_used_mb: Использовано VRAM в MB
 
     """
-    await manager.broadcast(
+    await get_connection_manager().broadcast(
         "model.loaded",
         {"model_name": model_name, "vram_used_mb": vram_used_mb},
     )
@@ -491,7 +592,7 @@ async def broadcast_model_unloaded(model_name: str, vram_freed_mb: int) -> None:
         vram_freed_mb: Освобождено VRAM в MB
 
     """
-    await manager.broadcast(
+    await get_connection_manager().broadcast(
         "model.unloaded",
         {"model_name": model_name, "vram_freed_mb": vram_freed_mb},
     )
@@ -510,4 +611,4 @@ async def broadcast_log(level: str, message: str, task_id: str | None = None) ->
     if task_id:
         data["task_id"] = task_id
 
-    await manager.broadcast("log", data, task_id=task_id)
+    await get_connection_manager().broadcast("log", data, task_id=task_id)
@@ -15,6 +15,7 @@ class TokenUsage(BaseModel):
     prompt_tokens: int = Field(description="Количество токенов в промпте")
     completion_tokens: int = Field(description="Количество токенов в ответе")
     total_tokens: int = Field(description="Общее количество токенов")
+    cached_tokens: int = Field(default=0, description="Токены промпта, взятые из prompt cache провайдера")
 
 
 class VRAMUsage(BaseModel):
@@ -15,6 +15,7 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from src.api.routes import conversations, embeddings, models, monitor, tasks, websocket
 from src.core.config import settings
 from src.engine.vram_monitor import get_vram_monitor
+from src.providers.litellm_provider import close_shared_http_client
 from src.providers.registry import get_provider_registry
 from src.services.conversation_store import (
     create_conversation_store,
@@ -95,6 +96,7 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     # Создать ConversationStore (использует тот же Redis client)
     conversation_store = create_conversation_store(session_store.redis)
+    await conversation_store.migrate_legacy_index()
     set_conversation_store(conversation_store)
     logger.info("ConversationStore инициализирован")
 
@@ -128,7 +130,7 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
         except Exception as e:
             logger.warning(f"VRAMMonitor недоступен (нет GPU?): {e}")
 
-        # 4. EmbeddingManager с lazy loading и FIFO eviction
+        # 4. EmbeddingManager с lazy loading и LRU eviction (разовые модели первыми)
         embedding_device = "cuda" if vram_monitor else "cpu"
         embedding_manager = EmbeddingManager(
             presets_loader=presets_loader,
@@ -190,6 +192,7 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     # Cleanup всех providers
     registry = get_provider_registry()
     await registry.cleanup_all()
+    await close_shared_http_client()
     logger.info("Providers cleanup выполнен")
 
     # Закрыть соединение с Redis
@@ -46,6 +46,7 @@ from src.core.constants import (
     DEFAULT_WEBHOOK_TIMEOUT,
     ISO_8601_FORMAT,
     REDIS_CONVERSATION_INDEX_KEY,
+    REDIS_CONVERSATION_LEGACY_INDEX_KEY,
     REDIS_CONVERSATION_PREFIX,
     REDIS_IDEMPOTENCY_PREFIX,
     REDIS_LOGS_PREFIX,
@@ -106,6 +107,7 @@ __all__ = [
     "DEFAULT_WEBHOOK_TIMEOUT",
     "ISO_8601_FORMAT",
     "REDIS_CONVERSATION_INDEX_KEY",
+    "REDIS_CONVERSATION_LEGACY_INDEX_KEY",
     "REDIS_CONVERSATION_PREFIX",
     "REDIS_IDEMPOTENCY_PREFIX",
     "REDIS_LOGS_PREFIX",
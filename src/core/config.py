@@ -7,6 +7,11 @@
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.core.constants import (
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE,
+    DEFAULT_LITELLM_SEMANTIC_CACHE_THRESHOLD,
+)
 from src.core.enums import AppEnvironment, LogLevel
 
 
@@ -63,6 +68,14 @@ class HttpSettings(BaseSettings):
 
     http_timeout_seconds: int = Field(description="Таймаут HTTP запросов")
     http_max_retries: int = Field(description="Количество повторов HTTP запросов")
+    http_max_connections: int = Field(
+        default=DEFAULT_HTTP_MAX_CONNECTIONS,
+        description="Максимум соединений в общем пуле httpx клиента LiteLLM",
+    )
+    http_max_keepalive: int = Field(
+        default=DEFAULT_HTTP_MAX_KEEPALIVE,
+        description="Максимум keep-alive соединений в общем пуле httpx клиента LiteLLM",
+    )
 
 
 class ModelSettings(BaseSettings):
@@ -98,6 +111,14 @@ class LiteLLMSettings(BaseSettings):
     litellm_drop_params: bool = Field(description="Автоматически удалять несовместимые параметры")
     litellm_max_retries: int = Field(description="Максимальное количество повторов LiteLLM")
     litellm_timeout: int = Field(description="Таймаут LiteLLM запросов (секунды)")
+    litellm_semantic_cache_model: str | None = Field(
+        default=None,
+        description="Embedding модель (пресет) для семантического кэша ответов; не задана - кэш выключен",
+    )
+    litellm_semantic_cache_threshold: float = Field(
+        default=DEFAULT_LITELLM_SEMANTIC_CACHE_THRESHOLD,
+        description="Порог косинусного сходства для попадания в семантический кэш",
+    )
 
 
 class LangfuseSettings(BaseSettings):
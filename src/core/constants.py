@@ -13,8 +13,15 @@ DEFAULT_WEBHOOK_TIMEOUT = 30
 DEFAULT_JSON_FIXER_TIMEOUT = 30
 
 DEFAULT_HTTP_MAX_RETRIES = 2
+DEFAULT_HTTP_MAX_CONNECTIONS = 100
+DEFAULT_HTTP_MAX_KEEPALIVE = 50
 DEFAULT_WEBHOOK_MAX_RETRIES = 3
 DEFAULT_LITELLM_MAX_RETRIES = 3
+DEFAULT_LITELLM_MAX_CONCURRENCY = 8
+DEFAULT_LITELLM_RESPONSE_CACHE_SIZE = 256
+DEFAULT_LITELLM_RESPONSE_CACHE_TTL = 300.0
+DEFAULT_LITELLM_SEMANTIC_CACHE_THRESHOLD = 0.92
+DEFAULT_LITELLM_HEALTH_PROBE_TIMEOUT = 5.0
 
 DEFAULT_SESSION_TTL = 3600
 DEFAULT_IDEMPOTENCY_TTL = 86400
@@ -29,6 +36,9 @@ DEFAULT_MAX_VRAM_USAGE_PERCENT = 90.0
 DEFAULT_VRAM_RESERVE_MB = 512
 
 DEFAULT_EMBEDDING_MODEL = "intfloat/multilingual-e5-large"
+DEFAULT_EMBEDDING_BATCH_SIZE_CPU = 32
+DEFAULT_EMBEDDING_BATCH_SIZE_GPU = 128
+DEFAULT_EMBEDDING_CACHE_SIZE = 4096
 DEFAULT_MODELS_DIR = "./models"
 
 DEFAULT_REDIS_HOST = "redis"
@@ -55,10 +65,13 @@ REDIS_PROCESSING_KEY = "queue:processing"
 REDIS_LOGS_PREFIX = "logs:"
 REDIS_LOGS_RECENT_KEY = "logs:recent"
 REDIS_CONVERSATION_PREFIX = "conversation:"
-REDIS_CONVERSATION_INDEX_KEY = "conversations:index"
+REDIS_CONVERSATION_INDEX_KEY = "conversations:index:created"
+REDIS_CONVERSATION_LEGACY_INDEX_KEY = "conversations:index"
 
 DEFAULT_CONVERSATION_TTL = 86400 * 7
 DEFAULT_MAX_CONVERSATION_MESSAGES = 100
+DEFAULT_CONVERSATION_META_CACHE_SIZE = 1024
+DEFAULT_CONVERSATION_META_CACHE_TTL = 2.0
 DEFAULT_CONTEXT_MESSAGES_LIMIT = 50
 
 DEFAULT_TOP_P = 1.0
@@ -267,6 +267,7 @@ class EmbeddingModelPreset(BaseModel):
         name: "multilingual-e5-large"
         huggingface_repo: "intfloat/multilingual-e5-large"
         dimensions: 1024
+        vram_mb: 2200
     """
 
     name: str = Field(
@@ -284,3 +285,9 @@ class EmbeddingModelPreset(BaseModel):
         gt=0,
         description="Размерность векторов (e.g. 1024 для multilingual-e5-large)",
     )
+
+    vram_mb: int | None = Field(
+        default=None,
+        gt=0,
+        description="Требуемый VRAM в MB (None = значение по умолчанию EmbeddingManager)",
+    )
@@ -3,8 +3,18 @@
 Поддерживает генерацию векторных представлений текстов.
 """
 
-from typing import Any
-
+import asyncio
+from collections import OrderedDict
+from typing import Any, Literal
+
+import numpy as np
+import xxhash
+
+from src.core.constants import (
+    DEFAULT_EMBEDDING_BATCH_SIZE_CPU,
+    DEFAULT_EMBEDDING_BATCH_SIZE_GPU,
+    DEFAULT_EMBEDDING_CACHE_SIZE,
+)
 from src.shared.logging import get_logger
 
 logger = get_logger()
@@ -30,6 +40,12 @@ class SentenceTransformerProvider:
         model_name: str,
         device: str | None = None,
         normalize_embeddings: bool = True,
+        batch_size: int | None = None,
+        precision: Literal["auto", "fp32", "fp16", "bf16"] = "auto",
+        compile_model: bool = False,
+        quantize: bool = False,
+        backend: Literal["torch", "onnx", "openvino"] = "torch",
+        cache_size: int = DEFAULT_EMBEDDING_CACHE_SIZE,
     ) -> None:
         """Инициализация provider.
 
@@ -37,11 +53,31 @@ class SentenceTransformerProvider:
             model_name: Название модели из HuggingFace
             device: Устройство для inference ('cpu', 'cuda', 'cuda:0', etc.)
             normalize_embeddings: Нормализовать векторы (L2 normalization)
+            batch_size: Размер батча для encode (None = 128 для CUDA, 32 для CPU)
+            precision: Точность весов ('auto' = fp16 на CUDA, fp32 на CPU)
+            compile_model: Скомпилировать transformer через torch.compile
+            quantize: Динамическая INT8 квантизация Linear слоёв (только CPU, fp32)
+            backend: Runtime для inference ('torch', 'onnx' через ONNX Runtime,
+                'openvino'); precision/quantize/compile_model применяются только к 'torch'
+            cache_size: Размер LRU кэша embeddings по тексту (0 = без кэша)
 
         """
         self.model_name = model_name
         self.device = device or "cpu"
+        self._uses_cuda = self.device.startswith("cuda")
         self.normalize_embeddings = normalize_embeddings
+        self.batch_size = batch_size or (
+            DEFAULT_EMBEDDING_BATCH_SIZE_GPU if self._uses_cuda else DEFAULT_EMBEDDING_BATCH_SIZE_CPU
+        )
+        self.precision = precision
+        self.compile_model = compile_model
+        self.quantize = quantize
+        self.backend = backend
+        self.cache_size = cache_size
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._pinned_buffer: Any = None
+        self._encode_lock = asyncio.Lock()
+        self._encode_queue: list[tuple[list[str], asyncio.Future[np.ndarray]]] = []
         self.model = None
         self.dimensions = 0
 
@@ -50,7 +86,75 @@ class SentenceTransformerProvider:
             model=model_name,
             device=self.device,
             normalize=normalize_embeddings,
+            batch_size=self.batch_size,
+            precision=precision,
+            compile_model=compile_model,
+            quantize=quantize,
+            backend=backend,
+        )
+
+    def _resolve_dtype(self) -> Any:
+        """Определить torch dtype для весов модели.
+
+        Returns:
+            torch.dtype или None если модель остаётся в fp32
+
+        """
+        precision = self.precision
+        if precision == "auto":
+            precision = "fp16" if self._uses_cuda else "fp32"
+
+        if precision == "fp32":
+            return None
+
+        import torch
+
+        return torch.float16 if precision == "fp16" else torch.bfloat16
+
+    def _quantize_transformer(self, dtype: Any) -> None:
+        """Применить динамическую INT8 квантизацию к Linear слоям transformer.
+
+        Квантизованные Linear ядра есть только для CPU и fp32 весов, поэтому
+        на CUDA или при fp16/bf16 квантизация пропускается.
+
+        Args:
+            dtype: torch dtype весов после _resolve_dtype (None = fp32)
+
+        """
+        if self._uses_cuda or dtype is not None:
+            logger.warning(
+                "INT8 квантизация доступна только для fp32 модели на CPU, пропускаем",
+                model=self.model_name,
+                device=self.device,
+            )
+            return
+
+        import torch
+
+        transformer = self.model[0]
+        transformer.auto_model = torch.ao.quantization.quantize_dynamic(
+            transformer.auto_model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
         )
+        logger.info("Embedding модель квантизована в INT8", model=self.model_name)
+
+    def _compile_transformer(self) -> None:
+        """Обернуть transformer модели в torch.compile.
+
+        dynamic=True позволяет не перекомпилировать граф под каждую длину
+        последовательности. Первый encode после загрузки (probe в load)
+        выполняет компиляцию, поэтому пользовательские запросы её не ждут.
+        """
+        import torch
+
+        transformer = self.model[0]
+        if not hasattr(torch, "compile") or not hasattr(transformer, "auto_model"):
+            logger.warning("torch.compile недоступен, модель остаётся eager", model=self.model_name)
+            return
+
+        transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+        logger.info("Embedding модель скомпилирована через torch.compile", model=self.model_name)
 
     async def load(self) -> None:
         """Загрузить модель в память.
@@ -71,33 +175,73 @@ class SentenceTransformerProvider:
             raise ImportError(msg) from e
 
         try:
-            logger.info("Загрузка embedding модели", model=self.model_name, device=self.device)
-
-            self.model = SentenceTransformer(self.model_name, device=self.device)
+            logger.info(
+                "Загрузка embedding модели",
+                model=self.model_name,
+                device=self.device,
+                backend=self.backend,
+            )
 
-            if self.model is not None:
-                test_embedding = self.model.encode("test", normalize_embeddings=self.normalize_embeddings)
-                self.dimensions = len(test_embedding)
+            # Загрузка весов, преобразования и probe синхронные и занимают
+            # секунды, поэтому выполняются в отдельном потоке.
+            dtype = await asyncio.to_thread(self._load_sync, SentenceTransformer)
 
             logger.info(
                 "Embedding модель загружена",
                 model=self.model_name,
                 dimensions=self.dimensions,
                 device=self.device,
+                backend=self.backend,
+                dtype=str(dtype) if dtype is not None else "float32",
             )
 
         except Exception as e:
             logger.exception("Ошибка загрузки embedding модели", model=self.model_name, error=str(e))
             raise
 
+    def _load_sync(self, model_cls: Any) -> Any:
+        """Синхронная часть load: создание модели, преобразования и probe.
+
+        Args:
+            model_cls: Класс SentenceTransformer
+
+        Returns:
+            torch dtype весов или None для fp32
+
+        """
+        self.model = model_cls(self.model_name, device=self.device, backend=self.backend)
+
+        dtype = None
+        if self.backend == "torch":
+            dtype = self._resolve_dtype()
+            if dtype is not None:
+                self.model.to(dtype=dtype)
+
+            if self.quantize:
+                self._quantize_transformer(dtype)
+
+            if self.compile_model:
+                self._compile_transformer()
+
+            # .to(dtype)/quantize_dynamic возвращают модули без гарантии
+            # режима, поэтому явно фиксируем eval после всех преобразований.
+            self.model.eval()
+
+        test_embedding = self.model.encode("test", normalize_embeddings=self.normalize_embeddings)
+        self.dimensions = len(test_embedding)
+
+        return dtype
+
     async def cleanup(self) -> None:
         """Очистить ресурсы модели."""
         if self.model is not None:
             logger.info("Очистка embedding модели", model=self.model_name)
             del self.model
             self.model = None
+            self._cache.clear()
+            self._pinned_buffer = None
 
-            if "cuda" in self.device:
+            if self._uses_cuda:
                 try:
                     import torch
 
@@ -105,14 +249,20 @@ class SentenceTransformerProvider:
                 except ImportError:
                     pass
 
-    async def generate_embeddings(self, texts: list[str]) -> list[list[float]]:
+    async def generate_embeddings(
+        self,
+        texts: list[str],
+        as_numpy: bool = False,
+    ) -> list[list[float]] | np.ndarray:
         """Сгенерировать embeddings для списка текстов.
 
         Args:
             texts: Список текстов для кодирования
+            as_numpy: Вернуть float32 ndarray формы (n, dimensions) без
+                конвертации в Python списки
 
         Returns:
-            Список векторных представлений (embeddings)
+            Список векторных представлений (embeddings) или ndarray при as_numpy
 
         Raises:
             ValueError: Если модель не загружена
@@ -123,7 +273,7 @@ class SentenceTransformerProvider:
             raise ValueError(msg)
 
         if not texts:
-            return []
+            return np.empty((0, self.dimensions), dtype=np.float32) if as_numpy else []
 
         try:
             logger.debug(
@@ -132,23 +282,19 @@ class SentenceTransformerProvider:
                 texts_count=len(texts),
             )
 
-            embeddings = self.model.encode(
-                texts,
-                normalize_embeddings=self.normalize_embeddings,
-                show_progress_bar=False,
-                convert_to_numpy=True,
-            )
-
-            result = [emb.tolist() for emb in embeddings]
+            embeddings = await self._encode_cached(texts)
 
             logger.debug(
                 "Embeddings сгенерированы",
                 model=self.model_name,
-                count=len(result),
-                dimensions=len(result[0]) if result else 0,
+                count=embeddings.shape[0],
+                dimensions=embeddings.shape[1] if embeddings.ndim == 2 else 0,
             )
 
-            return result
+            if as_numpy:
+                return embeddings
+
+            return embeddings.tolist()
 
         except Exception as e:
             logger.exception(
@@ -158,6 +304,198 @@ class SentenceTransformerProvider:
             )
             raise
 
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Закодировать тексты моделью без использования кэша.
+
+        Args:
+            texts: Список текстов
+
+        Returns:
+            float32 матрица (len(texts), dimensions)
+
+        """
+        # encode сам сортирует тексты по длине внутри вызова, поэтому
+        # батчи паддятся минимально и порядок результата сохраняется.
+        # На GPU результат остаётся тензором до конца encode и копируется
+        # на CPU одним переносом, а не отдельно для каждого батча.
+        import torch
+
+        on_gpu = self._uses_cuda
+        # inference_mode отключает и autograd, и version counters тензоров,
+        # в отличие от no_grad, который encode использует внутри.
+        with torch.inference_mode():
+            embeddings = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize_embeddings,
+                show_progress_bar=False,
+                convert_to_numpy=not on_gpu,
+                convert_to_tensor=on_gpu,
+            )
+
+        if on_gpu:
+            return self._copy_to_host(embeddings)
+
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def _copy_to_host(self, tensor: Any) -> np.ndarray:
+        """Скопировать GPU тензор embeddings на CPU через pinned буфер.
+
+        Pinned буфер переиспользуется между вызовами (выделение page-locked
+        памяти дорогое) и растёт только при увеличении батча. Результат
+        копируется из буфера, так как буфер перезаписывается следующим вызовом.
+
+        Args:
+            tensor: Тензор (n, dimensions) на CUDA
+
+        Returns:
+            float32 матрица (n, dimensions)
+
+        """
+        import torch
+
+        tensor = tensor.detach().float()
+        numel = tensor.numel()
+
+        if self._pinned_buffer is None or self._pinned_buffer.numel() < numel:
+            self._pinned_buffer = torch.empty(numel, dtype=torch.float32, pin_memory=True)
+
+        host = self._pinned_buffer[:numel].view(tensor.shape)
+        host.copy_(tensor, non_blocking=True)
+        torch.cuda.current_stream(tensor.device).synchronize()
+
+        return host.numpy().copy()
+
+    async def _encode_off_loop(self, texts: list[str]) -> np.ndarray:
+        """Выполнить _encode в отдельном потоке, не блокируя event loop.
+
+        Вызовы сериализуются lock'ом: модель и pinned буфер не рассчитаны
+        на параллельное использование из нескольких потоков. Пока идёт
+        encode, новые запросы накапливаются в очереди, и следующий владелец
+        lock кодирует их все одним вызовом (micro-batching без таймера:
+        одиночный запрос не ждёт, а под нагрузкой батчи растут сами).
+
+        Args:
+            texts: Список текстов
+
+        Returns:
+            float32 матрица (len(texts), dimensions)
+
+        """
+        future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+        self._encode_queue.append((texts, future))
+        try:
+            async with self._encode_lock:
+                if not future.done():
+                    batch, self._encode_queue = self._encode_queue, []
+                    await self._encode_batch(batch)
+        except asyncio.CancelledError:
+            self._encode_queue = [item for item in self._encode_queue if item[1] is not future]
+            raise
+
+        return future.result()
+
+    async def _encode_batch(self, batch: list[tuple[list[str], asyncio.Future[np.ndarray]]]) -> None:
+        """Закодировать накопленные запросы одним вызовом _encode.
+
+        Результат разрезается по запросам; ошибка передаётся всем запросам батча.
+        Поток с encode нельзя прервать, поэтому при отмене вызывающей задачи
+        метод всё равно дожидается его завершения (и удерживает _encode_lock),
+        раздаёт результат запросам батча и только затем пробрасывает отмену.
+
+        Args:
+            batch: Пары (тексты запроса, Future для его результата)
+
+        Raises:
+            asyncio.CancelledError: Если задача была отменена во время encode
+
+        """
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        if len(batch) > 1:
+            logger.debug("Embeddings micro-batch", model=self.model_name, requests=len(batch), texts_count=len(texts))
+
+        worker = asyncio.ensure_future(asyncio.to_thread(self._encode, texts))
+        cancelled = False
+        while not worker.done():
+            try:
+                await asyncio.shield(worker)
+            except asyncio.CancelledError:
+                cancelled = True
+            except Exception:  # ошибка передаётся запросам в _resolve_batch
+                break
+
+        self._resolve_batch(batch, worker)
+        if cancelled:
+            raise asyncio.CancelledError
+
+    @staticmethod
+    def _resolve_batch(
+        batch: list[tuple[list[str], asyncio.Future[np.ndarray]]],
+        worker: asyncio.Future[np.ndarray],
+    ) -> None:
+        """Раздать результат завершённого encode запросам батча.
+
+        Args:
+            batch: Пары (тексты запроса, Future для его результата)
+            worker: Завершённый Future вызова _encode
+
+        """
+        error = worker.exception()
+        if error is not None:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        encoded = worker.result()
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(encoded[offset : offset + len(request_texts)])
+            offset += len(request_texts)
+
+    async def _encode_cached(self, texts: list[str]) -> np.ndarray:
+        """Закодировать тексты, используя LRU кэш по xxh3 хэшу текста.
+
+        Модель вызывается только для текстов, которых нет в кэше; повторы
+        внутри одного запроса кодируются один раз. Кэш читается и обновляется
+        в потоке event loop, в отдельный поток уходит только encode.
+
+        Args:
+            texts: Список текстов
+
+        Returns:
+            float32 матрица (len(texts), dimensions)
+
+        """
+        if self.cache_size <= 0:
+            return await self._encode_off_loop(texts)
+
+        result = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        pending: dict[int, list[int]] = {}
+
+        for i, text in enumerate(texts):
+            key = xxhash.xxh3_64_intdigest(text)
+            row = self._cache.get(key)
+            if row is not None:
+                self._cache.move_to_end(key)
+                result[i] = row
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if not pending:
+            return result
+
+        miss_keys = list(pending)
+        encoded = await self._encode_off_loop([texts[pending[key][0]] for key in miss_keys])
+
+        for key, row in zip(miss_keys, encoded, strict=True):
+            result[pending[key]] = row
+            self._cache[key] = row.copy()
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return result
+
     def get_info(self) -> dict[str, Any]:
         """Получить информацию о provider.
 
@@ -171,5 +509,12 @@ class SentenceTransformerProvider:
             "dimensions": self.dimensions,
             "device": self.device,
             "normalize_embeddings": self.normalize_embeddings,
+            "batch_size": self.batch_size,
+            "precision": self.precision,
+            "compiled": self.compile_model,
+            "quantized": self.quantize,
+            "backend": self.backend,
+            "cache_size": self.cache_size,
+            "cached_embeddings": len(self._cache),
             "loaded": self.model is not None,
         }
@@ -6,15 +6,183 @@
 Поддерживает: Anthropic, OpenAI, Google Gemini, Mistral, Cohere, Azure и многие другие.
 """
 
-from collections.abc import AsyncIterator
-from typing import Any
-
+import asyncio
+import contextlib
+import hashlib
+import inspect
+import random
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Literal, overload
+
+import httpx
 import litellm
+import numpy as np
+import orjson
 from litellm import ModelResponse, acompletion
-from loguru import logger
 
+from src.core.config import settings
+from src.core.constants import (
+    DEFAULT_LITELLM_HEALTH_PROBE_TIMEOUT,
+    DEFAULT_LITELLM_MAX_CONCURRENCY,
+    DEFAULT_LITELLM_RESPONSE_CACHE_SIZE,
+    DEFAULT_LITELLM_RESPONSE_CACHE_TTL,
+    DEFAULT_LITELLM_SEMANTIC_CACHE_THRESHOLD,
+)
 from src.core.enums import FinishReason, ProviderType
 from src.providers.base import ChatMessage, GenerationParams, GenerationResult, ModelInfo, StreamChunk
+from src.shared.logging import get_logger
+
+logger = get_logger()
+
+_DEFAULT_GENERATION_PARAMS = GenerationParams()
+
+_role_and_content = attrgetter("role", "content")
+
+_FINISH_REASON_MAP: dict[str | None, FinishReason] = {
+    "stop": FinishReason.STOP,
+    "length": FinishReason.LENGTH,
+    "max_tokens": FinishReason.LENGTH,
+}
+
+_ZERO_USAGE: dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_tokens": 0}
+
+
+def _cached_prompt_tokens(usage: Any) -> int:
+    """Извлечь число токенов промпта, взятых из prompt cache провайдера.
+
+    LiteLLM нормализует их в usage.prompt_tokens_details.cached_tokens;
+    провайдеры без prompt caching присылают None или не присылают поле.
+
+    Args:
+        usage: Объект usage из ответа или stream chunk LiteLLM
+
+    Returns:
+        Количество закэшированных токенов промпта (0 если неизвестно)
+
+    """
+    cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+    return cached if isinstance(cached, int) else 0
+
+
+_DEFAULT_MODEL_LIMITS: tuple[int, int] = (4096, 2048)
+
+# Ошибки, после которых запрос имеет смысл повторить.
+_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    litellm.RateLimitError,
+    litellm.APIConnectionError,
+    litellm.Timeout,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+)
+_RETRY_BASE_DELAY = 0.1
+_RETRY_MAX_DELAY = 10.0
+
+# Провайдеры, которые возвращают несколько choices на один запрос через n=.
+_SUPPORTS_N = frozenset({"openai", "azure"})
+
+# Провайдеры, у которых prompt caching включается только явной разметкой
+# cache_control (OpenAI кэширует общий префикс автоматически).
+_EXPLICIT_PROMPT_CACHE = frozenset({"anthropic"})
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_shared_http_client(timeout: float) -> httpx.AsyncClient:
+    """Получить общий для процесса httpx клиент LiteLLM.
+
+    Клиент регистрируется как litellm.aclient_session, поэтому все
+    провайдеры переиспользуют один пул keep-alive соединений вместо
+    TCP+TLS handshake на каждый запрос.
+
+    Args:
+        timeout: Таймаут по умолчанию (используется при создании клиента)
+
+    Returns:
+        Общий httpx.AsyncClient
+
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.http_max_keepalive,
+                max_connections=settings.http_max_connections,
+            ),
+            timeout=timeout,
+        )
+        litellm.aclient_session = _http_client
+    return _http_client
+
+
+async def close_shared_http_client() -> None:
+    """Закрыть общий httpx клиент LiteLLM (вызывается при shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    litellm.aclient_session = None
+
+
+# (группы подстрок, (context_window, max_output_tokens)). Модель подходит,
+# если в её имени есть хотя бы одна подстрока из каждой группы; первая
+# подходящая запись побеждает, поэтому более специфичные идут раньше.
+_MODEL_LIMITS: tuple[tuple[tuple[tuple[str, ...], ...], tuple[int, int]], ...] = (
+    ((("claude-sonnet-4", "claude-opus-4"),), (200000, 32000)),
+    ((("claude-3",),), (200000, 4096)),
+    ((("claude-2",),), (100000, 4096)),
+    ((("gpt-4.1",),), (1047576, 32768)),
+    ((("gpt-4o",),), (128000, 16384)),
+    ((("o1-",),), (128000, 32768)),
+    ((("gpt-4",), ("turbo", "1106", "0125")), (128000, 4096)),
+    ((("gpt-4",),), (8192, 4096)),
+    ((("gpt-3.5",), ("16k",)), (16384, 4096)),
+    ((("gpt-3.5",),), (4096, 4096)),
+    ((("gemini", "mistral"),), (32000, 8192)),
+)
+
+
+@lru_cache(maxsize=64)
+def _build_sampling_params(
+    temperature: float,
+    max_tokens: int,
+    top_p: float,
+    top_k: int,
+    frequency_penalty: float,
+    presence_penalty: float,
+    stop: tuple[str, ...],
+    seed: int | None,
+) -> dict[str, Any]:
+    """Собрать скалярные параметры LiteLLM (мемоизировано по значениям).
+
+    Возвращаемый dict общий для всех вызовов с теми же значениями, поэтому
+    вызывающий код должен копировать его перед изменением.
+    """
+    litellm_params: dict[str, Any] = {
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "top_p": top_p,
+    }
+
+    if frequency_penalty != 0.0:
+        litellm_params["frequency_penalty"] = frequency_penalty
+
+    if presence_penalty != 0.0:
+        litellm_params["presence_penalty"] = presence_penalty
+
+    if stop:
+        litellm_params["stop"] = stop
+
+    if seed is not None:
+        litellm_params["seed"] = seed
+
+    if top_k > 0 and top_k != 40:
+        litellm_params["top_k"] = top_k
+
+    return litellm_params
 
 
 class LiteLLMProvider:
@@ -36,6 +204,11 @@ class LiteLLMProvider:
         # Mistral
         provider = LiteLLMProvider(model_name="mistral/mistral-large-latest")
 
+    Note:
+        Провайдер рассчитан на event loop uvloop (uvicorn[standard],
+        ``--loop uvloop``): стриминг порождает много мелких callback'ов
+        на каждый токен, и libuv-цикл обрабатывает их заметно быстрее.
+
     """
 
     def __init__(
@@ -47,6 +220,14 @@ class LiteLLMProvider:
         max_retries: int = 3,
         drop_params: bool = True,
         keep_alive: str | None = None,
+        health_ttl: float = 30.0,
+        response_cache_size: int = DEFAULT_LITELLM_RESPONSE_CACHE_SIZE,
+        response_cache_ttl: float = DEFAULT_LITELLM_RESPONSE_CACHE_TTL,
+        semantic_embedder: Callable[[str], Awaitable[np.ndarray]] | None = None,
+        semantic_threshold: float = DEFAULT_LITELLM_SEMANTIC_CACHE_THRESHOLD,
+        max_concurrency: int = DEFAULT_LITELLM_MAX_CONCURRENCY,
+        stream_coalesce_interval: float = 0.0,
+        stream_coalesce_max_parts: int = 8,
         **extra_params: Any,
     ) -> None:
         """Инициализировать LiteLLM provider.
@@ -59,6 +240,16 @@ class LiteLLMProvider:
             max_retries: Максимальное количество повторных попыток при ошибке
             drop_params: Автоматически удалять неподдерживаемые параметры
             keep_alive: Время удержания модели в памяти для Ollama (e.g. '5m', '1h', '-1')
+            health_ttl: Время жизни закэшированного результата health_check в секундах
+            response_cache_size: Размер кэша ответов для temperature=0 (0 = без кэша)
+            response_cache_ttl: Время жизни закэшированного ответа в секундах
+            semantic_embedder: Async функция text -> embedding; включает семантический
+                кэш ответов для temperature=0 (None = выключен)
+            semantic_threshold: Минимальное косинусное сходство для попадания в семантический кэш
+            max_concurrency: Максимум одновременных запросов в generate_batch/generate_many
+            stream_coalesce_interval: Окно склейки мелких stream дельт в секундах
+                (0 = каждая дельта отдаётся отдельным chunk)
+            stream_coalesce_max_parts: Максимум дельт в одном склеенном chunk
             **extra_params: Дополнительные специфичные для провайдера параметры
 
         """
@@ -68,22 +259,65 @@ class LiteLLMProvider:
         self.timeout = timeout
         self.max_retries = max_retries
         self.keep_alive = keep_alive
+        self.health_ttl = health_ttl
         self.extra_params = extra_params
 
-        litellm.drop_params = drop_params
-        litellm.num_retries = max_retries
+        self._health_cache: tuple[float, bool] | None = None
+        self._health_lock = asyncio.Lock()
+
+        self.response_cache_size = response_cache_size
+        self.response_cache_ttl = response_cache_ttl
+        self._response_cache: OrderedDict[str, tuple[float, GenerationResult]] = OrderedDict()
+        self.cache_stats = {"hits": 0, "misses": 0, "semantic_hits": 0}
+        self._inflight: dict[str, asyncio.Future[GenerationResult | None]] = {}
+
+        self.semantic_embedder = semantic_embedder
+        self.semantic_threshold = semantic_threshold
+        self._semantic_vectors: np.ndarray | None = None
+        self._semantic_entries: list[tuple[str, float, GenerationResult]] = []
+
+        self.max_concurrency = max_concurrency
+        self.stream_coalesce_interval = stream_coalesce_interval
+        self.stream_coalesce_max_parts = stream_coalesce_max_parts
+        self._llm_provider = self._resolve_llm_provider()
+        self._model_info = self._resolve_model_info()
+
+        # Неизменяемая часть kwargs для acompletion собирается один раз;
+        # None-значения не передаются, LiteLLM возьмёт их из окружения.
+        self._base_kwargs: dict[str, Any] = {
+            key: value
+            for key, value in (
+                ("model", model_name),
+                ("api_key", api_key),
+                ("base_url", base_url),
+                ("timeout", timeout),
+                ("keep_alive", keep_alive),
+            )
+            if value is not None
+        }
+        # Повторы выполняет _acompletion_with_retry с jitter, встроенные
+        # повторы LiteLLM отключены, чтобы не умножать число попыток.
+        self._base_kwargs["num_retries"] = 0
+        # drop_params передаётся в каждый вызов, а не через глобальный
+        # litellm.drop_params, чтобы провайдеры с разной конфигурацией
+        # не перетирали настройки друг друга.
+        self._base_kwargs["drop_params"] = drop_params
+
+        get_shared_http_client(timeout)
 
         logger.info(
-            f"LiteLLMProvider инициализирован: model={model_name}, "
-            f"timeout={timeout}s, retries={max_retries}"
-            + (f", keep_alive={keep_alive}" if keep_alive else "")
+            "LiteLLMProvider инициализирован",
+            model=model_name,
+            timeout=timeout,
+            retries=max_retries,
+            keep_alive=keep_alive,
         )
 
     def _prepare_messages(
         self,
         prompt: str | None = None,
         messages: list[ChatMessage] | None = None,
-    ) -> list[dict[str, str]]:
+    ) -> list[dict[str, Any]]:
         """Конвертировать prompt или messages в формат LiteLLM messages.
 
         Args:
@@ -96,11 +330,22 @@ class LiteLLMProvider:
         Raises:
             ValueError: Если не указан ни prompt, ни messages
 
+        Note:
+            Для провайдеров из _EXPLICIT_PROMPT_CACHE ведущее system
+            сообщение помечается cache_control: статический префикс
+            кэшируется провайдером и не тарифицируется повторно.
+
         """
         if messages:
-            return [{"role": msg.role, "content": msg.content} for msg in messages]
-
-        if prompt:
+            messages_list = [{"role": role, "content": content} for role, content in map(_role_and_content, messages)]
+            if self._llm_provider in _EXPLICIT_PROMPT_CACHE and messages_list[0]["role"] == "system":
+                messages_list[0]["content"] = [
+                    {"type": "text", "text": messages_list[0]["content"], "cache_control": {"type": "ephemeral"}},
+                ]
+            return messages_list
+
+        # Пустой или пробельный промпт отклоняется до обращения к API.
+        if prompt and not prompt.isspace():
             return [{"role": "user", "content": prompt}]
 
         raise ValueError("Необходимо указать либо 'prompt', либо 'messages'")
@@ -116,59 +361,376 @@ class LiteLLMProvider:
 
         """
         if params is None:
-            params = GenerationParams()
-
-        litellm_params: dict[str, Any] = {
-            "temperature": params.temperature,
-            "max_tokens": params.max_tokens,
-            "top_p": params.top_p,
-        }
-
-        if params.frequency_penalty != 0.0:
-            litellm_params["frequency_penalty"] = params.frequency_penalty
-
-        if params.presence_penalty != 0.0:
-            litellm_params["presence_penalty"] = params.presence_penalty
-
-        if params.stop_sequences:
-            litellm_params["stop"] = params.stop_sequences
+            params = _DEFAULT_GENERATION_PARAMS
+
+        litellm_params = dict(
+            _build_sampling_params(
+                params.temperature,
+                params.max_tokens,
+                params.top_p,
+                params.top_k,
+                params.frequency_penalty,
+                params.presence_penalty,
+                tuple(params.stop_sequences),
+                params.seed,
+            )
+        )
 
-        if params.seed is not None:
-            litellm_params["seed"] = params.seed
+        if "stop" in litellm_params:
+            litellm_params["stop"] = list(litellm_params["stop"])
 
         if params.response_format:
             litellm_params["response_format"] = params.response_format
 
-        if params.top_k > 0 and params.top_k != 40:
-            litellm_params["top_k"] = params.top_k
-
         if params.extra:
             litellm_params.update(params.extra)
 
         return litellm_params
 
-    def _extract_usage(self, response: ModelResponse) -> dict[str, int]:
+    def _build_request_kwargs(
+        self,
+        messages_list: list[dict[str, Any]],
+        litellm_params: dict[str, Any],
+        *,
+        stream: bool,
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Собрать аргументы вызова acompletion.
+
+        Общий билдер для generate и generate_stream. Постоянные аргументы
+        берутся из заранее собранного _base_kwargs.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры генерации из _prepare_params
+            stream: Включить streaming
+            metadata: Метаданные для Langfuse
+
+        Returns:
+            Словарь kwargs для acompletion
+
+        """
+        request_kwargs = {**self._base_kwargs, "messages": messages_list, "stream": stream, **litellm_params}
+
+        if self.extra_params:
+            request_kwargs.update(self.extra_params)
+
+        if metadata:
+            request_kwargs["metadata"] = metadata
+
+        return request_kwargs
+
+    async def _acompletion_with_retry(self, request_kwargs: dict[str, Any]) -> Any:
+        """Вызвать acompletion с повторами и decorrelated jitter.
+
+        Задержка между попытками случайна в диапазоне [base, 3 * предыдущая]
+        (не более _RETRY_MAX_DELAY), поэтому параллельные запросы, получившие
+        429 одновременно, не повторяются синхронно. Если провайдер прислал
+        Retry-After, используется он.
+
+        Args:
+            request_kwargs: Аргументы acompletion
+
+        Returns:
+            Ответ acompletion
+
+        """
+        delay = _RETRY_BASE_DELAY
+        attempt = 0
+
+        while True:
+            try:
+                return await acompletion(**request_kwargs)
+            except _RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+
+                delay = min(_RETRY_MAX_DELAY, random.uniform(_RETRY_BASE_DELAY, delay * 3))  # noqa: S311
+                wait = self._retry_after(e) or delay
+
+                logger.warning(
+                    "Повтор запроса LiteLLM",
+                    model=self.model_name,
+                    attempt=attempt,
+                    wait=round(wait, 3),
+                    error=type(e).__name__,
+                )
+                await asyncio.sleep(wait)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> float | None:
+        """Извлечь Retry-After (в секундах) из ответа провайдера.
+
+        Args:
+            error: Исключение LiteLLM
+
+        Returns:
+            Задержка в секундах или None если заголовка нет
+
+        """
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+
+        try:
+            return min(_RETRY_MAX_DELAY, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            return None
+
+    def _response_cache_key(
+        self,
+        messages_list: list[dict[str, Any]],
+        litellm_params: dict[str, Any],
+    ) -> str | None:
+        """Вычислить ключ кэша ответа для детерминированного запроса.
+
+        Кэшируются только воспроизводимые запросы: temperature=0 или
+        явно заданный seed. Параметры, которые не сериализуются в JSON,
+        отключают кэш для запроса.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры генерации из _prepare_params
+
+        Returns:
+            SHA-256 ключ или None если запрос не кэшируется
+
+        """
+        if self.response_cache_size <= 0:
+            return None
+        if litellm_params.get("temperature") != 0 and litellm_params.get("seed") is None:
+            return None
+
+        try:
+            payload = orjson.dumps(
+                {"model": self.model_name, "messages": messages_list, "params": litellm_params},
+                option=orjson.OPT_SORT_KEYS,
+            )
+        except TypeError:
+            return None
+
+        return hashlib.sha256(payload).hexdigest()
+
+    def _get_cached_response(self, cache_key: str) -> GenerationResult | None:
+        """Получить ответ из кэша, если он есть и не устарел.
+
+        Args:
+            cache_key: Ключ из _response_cache_key
+
+        Returns:
+            Копия закэшированного результата или None
+
+        """
+        entry = self._response_cache.get(cache_key)
+        if entry is None or time.monotonic() - entry[0] >= self.response_cache_ttl:
+            if entry is not None:
+                del self._response_cache[cache_key]
+            self.cache_stats["misses"] += 1
+            return None
+
+        self._response_cache.move_to_end(cache_key)
+        self.cache_stats["hits"] += 1
+        return self._as_cache_hit(entry[1])
+
+    @staticmethod
+    def _as_cache_hit(result: GenerationResult) -> GenerationResult:
+        """Вернуть копию закэшированного результата для ответа клиенту.
+
+        Токены за ответ из кэша не расходуются, поэтому usage обнуляется,
+        а в extra выставляется cache_hit.
+
+        Args:
+            result: Закэшированный результат генерации
+
+        Returns:
+            Копия результата с нулевым usage
+
+        """
+        return result.model_copy(update={"usage": dict(_ZERO_USAGE), "extra": {**result.extra, "cache_hit": True}})
+
+    def _store_cached_response(self, cache_key: str, result: GenerationResult) -> None:
+        """Сохранить ответ в кэш с LRU вытеснением.
+
+        Args:
+            cache_key: Ключ из _response_cache_key
+            result: Результат генерации
+
+        """
+        self._response_cache[cache_key] = (time.monotonic(), result.model_copy())
+        self._response_cache.move_to_end(cache_key)
+
+        while len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _semantic_context_key(self, messages_list: list[dict[str, Any]], litellm_params: dict[str, Any]) -> str:
+        """Вычислить ключ контекста для семантического кэша.
+
+        Семантически сравниваются только user сообщения; system/assistant
+        сообщения и параметры генерации должны совпадать точно.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры генерации
+
+        Returns:
+            SHA-256 ключ контекста
+
+        """
+        context = [msg for msg in messages_list if msg["role"] != "user"]
+        payload = orjson.dumps(
+            {"model": self.model_name, "context": context, "params": litellm_params},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    async def _embed_for_semantic_cache(self, messages_list: list[dict[str, Any]]) -> np.ndarray:
+        """Получить нормализованный embedding user сообщений запроса.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+
+        Returns:
+            L2-нормализованный float32 вектор
+
+        """
+        text = "\n".join(msg["content"] for msg in messages_list if msg["role"] == "user")
+        vector = np.asarray(await self.semantic_embedder(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_lookup(self, vector: np.ndarray, context_key: str) -> GenerationResult | None:
+        """Найти закэшированный ответ на семантически близкий запрос.
+
+        Args:
+            vector: Нормализованный embedding запроса
+            context_key: Ключ из _semantic_context_key
+
+        Returns:
+            Копия результата или None если похожих запросов нет
+
+        """
+        if self._semantic_vectors is None:
+            return None
+
+        now = time.monotonic()
+        similarities = self._semantic_vectors @ vector
+        for index in np.argsort(similarities)[::-1]:
+            if similarities[index] < self.semantic_threshold:
+                break
+            entry_context, stored_at, result = self._semantic_entries[index]
+            if entry_context == context_key and now - stored_at < self.response_cache_ttl:
+                self.cache_stats["semantic_hits"] += 1
+                return self._as_cache_hit(result)
+
+        return None
+
+    def _semantic_store(self, vector: np.ndarray, context_key: str, result: GenerationResult) -> None:
+        """Добавить ответ в семантический кэш (FIFO в пределах response_cache_size).
+
+        Вызывается синхронно после await, поэтому в рамках event loop
+        изменение индекса атомарно и отдельный lock не нужен.
+
+        Args:
+            vector: Нормализованный embedding запроса
+            context_key: Ключ из _semantic_context_key
+            result: Результат генерации
+
+        """
+        row = vector[np.newaxis, :]
+        if self._semantic_vectors is None or self._semantic_vectors.shape[1] != vector.shape[0]:
+            self._semantic_vectors = row
+            self._semantic_entries = []
+        else:
+            self._semantic_vectors = np.vstack((self._semantic_vectors, row))
+        self._semantic_entries.append((context_key, time.monotonic(), result.model_copy()))
+
+        overflow = len(self._semantic_entries) - self.response_cache_size
+        if overflow > 0:
+            self._semantic_vectors = self._semantic_vectors[overflow:]
+            del self._semantic_entries[:overflow]
+
+    @staticmethod
+    def _response_provider(response: ModelResponse) -> str:
+        """Определить провайдера, фактически обработавшего запрос.
+
+        Args:
+            response: Ответ LiteLLM
+
+        Returns:
+            custom_llm_provider из _hidden_params или "unknown"
+
+        """
+        return getattr(response, "_hidden_params", {}).get("custom_llm_provider", "unknown")
+
+    @staticmethod
+    def _extract_usage(response: ModelResponse) -> dict[str, int]:
         """Извлечь информацию об использовании токенов из ответа LiteLLM.
 
         Args:
             response: Объект ответа LiteLLM
 
         Returns:
-            Словарь usage с prompt_tokens, completion_tokens, total_tokens
+            Словарь usage с prompt_tokens, completion_tokens, total_tokens, cached_tokens
 
         """
-        usage = getattr(response, "usage", None)
-
-        if usage:
+        try:
+            usage = response.usage
             return {
-                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
-                "completion_tokens": getattr(usage, "completion_tokens", 0),
-                "total_tokens": getattr(usage, "total_tokens", 0),
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+                "cached_tokens": _cached_prompt_tokens(usage),
             }
+        except AttributeError:
+            return dict(_ZERO_USAGE)
 
-        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    @staticmethod
+    def _extract_stream_usage(chunk: Any) -> dict[str, int] | None:
+        """Извлечь точный usage из stream chunk, если провайдер его прислал.
+
+        Args:
+            chunk: Stream chunk LiteLLM
+
+        Returns:
+            Словарь usage или None если в chunk нет подсчёта токенов
 
-    def _map_finish_reason(self, reason: str | None) -> FinishReason:
+        """
+        usage = getattr(chunk, "usage", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(completion_tokens, int):
+            return None
+
+        prompt_tokens = getattr(usage, "prompt_tokens", 0)
+        prompt_tokens = prompt_tokens if isinstance(prompt_tokens, int) else 0
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cached_tokens": _cached_prompt_tokens(usage),
+        }
+
+    @staticmethod
+    async def _close_stream(response: Any) -> None:
+        """Закрыть stream LiteLLM, освободив HTTP соединение.
+
+        Args:
+            response: Stream, полученный от acompletion(stream=True)
+
+        """
+        close = getattr(response, "aclose", None) or getattr(
+            getattr(response, "completion_stream", None), "close", None
+        )
+        if close is None:
+            return
+
+        with contextlib.suppress(Exception):
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+
+    @staticmethod
+    def _map_finish_reason(reason: str | None) -> FinishReason:
         """Преобразовать finish_reason из LiteLLM в стандартный формат.
 
         Args:
@@ -178,11 +740,7 @@ class LiteLLMProvider:
             Стандартизированная причина завершения
 
         """
-        if reason == "stop":
-            return FinishReason.STOP
-        if reason in ("length", "max_tokens"):
-            return FinishReason.LENGTH
-        return FinishReason.ERROR
+        return _FINISH_REASON_MAP.get(reason, FinishReason.ERROR)
 
     async def generate(
         self,
@@ -211,47 +769,313 @@ class LiteLLMProvider:
             messages_list = self._prepare_messages(prompt, messages)
             litellm_params = self._prepare_params(params)
 
-            logger.debug(f"LiteLLM генерация: model={self.model_name}, messages={len(messages_list)}")
+            cache_key = self._response_cache_key(messages_list, litellm_params)
+            if cache_key is None:
+                return await self._complete(messages_list, litellm_params, metadata)
 
-            completion_kwargs: dict[str, Any] = {
-                "model": self.model_name,
-                "messages": messages_list,
-                "api_key": self.api_key,
-                "base_url": self.base_url,
-                "timeout": self.timeout,
-                "stream": False,
-                **litellm_params,
-                **self.extra_params,
-            }
+            return await self._generate_single_flight(cache_key, messages_list, litellm_params, metadata)
 
-            if self.keep_alive is not None:
-                completion_kwargs["keep_alive"] = self.keep_alive
+        except Exception as e:
+            logger.error("Ошибка генерации LiteLLM", model=self.model_name, error=str(e))
+            msg = f"Ошибка генерации LiteLLM: {e}"
+            raise RuntimeError(msg) from e
 
-            if metadata:
-                completion_kwargs["metadata"] = metadata
+    async def _generate_single_flight(
+        self,
+        cache_key: str,
+        messages_list: list[dict[str, Any]],
+        litellm_params: dict[str, Any],
+        metadata: dict[str, Any] | None,
+    ) -> GenerationResult:
+        """Выполнить кэшируемый запрос: кэш ответов + single-flight.
 
-            response: ModelResponse = await acompletion(**completion_kwargs)
+        Одинаковые параллельные запросы ждут результат первого (лидера)
+        вместо повторного вызова API. Если лидер не справился, первый
+        проснувшийся ожидающий становится новым лидером, остальные ждут его.
 
-            choice = response.choices[0]
-            text = choice.message.content or ""
-            finish_reason = self._map_finish_reason(choice.finish_reason)
-            usage = self._extract_usage(response)
+        Args:
+            cache_key: Ключ из _response_cache_key
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры LiteLLM
+            metadata: Метаданные для Langfuse
+
+        Returns:
+            Результат генерации
+
+        """
+        while True:
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.debug("LiteLLM ответ из кэша", model=self.model_name)
+                return cached
+
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                break
+
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                logger.debug("LiteLLM ответ параллельного запроса", model=self.model_name)
+                return self._as_cache_hit(shared)
+
+        inflight: asyncio.Future[GenerationResult | None] = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = inflight
+        try:
+            result = await self._generate_with_semantic_cache(cache_key, messages_list, litellm_params, metadata)
+            inflight.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(cache_key, None)
+            if not inflight.done():
+                inflight.set_result(None)
+
+    async def _generate_with_semantic_cache(
+        self,
+        cache_key: str,
+        messages_list: list[dict[str, Any]],
+        litellm_params: dict[str, Any],
+        metadata: dict[str, Any] | None,
+    ) -> GenerationResult:
+        """Ответить из семантического кэша или вызвать API и закэшировать ответ.
+
+        Args:
+            cache_key: Ключ из _response_cache_key
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры LiteLLM
+            metadata: Метаданные для Langfuse
+
+        Returns:
+            Результат генерации
+
+        """
+        semantic_vector: np.ndarray | None = None
+        semantic_context = ""
+        if self.semantic_embedder is not None:
+            semantic_context = self._semantic_context_key(messages_list, litellm_params)
+            semantic_vector, cached = await self._semantic_cache_lookup(messages_list, semantic_context)
+            if cached is not None:
+                logger.debug("LiteLLM ответ из семантического кэша", model=self.model_name)
+                return cached
+
+        result = await self._complete(messages_list, litellm_params, metadata)
+
+        self._store_cached_response(cache_key, result)
+        if semantic_vector is not None:
+            self._semantic_store(semantic_vector, semantic_context, result)
+
+        return result
+
+    async def _semantic_cache_lookup(
+        self,
+        messages_list: list[dict[str, Any]],
+        context_key: str,
+    ) -> tuple[np.ndarray | None, GenerationResult | None]:
+        """Получить embedding запроса и найти похожий ответ в семантическом кэше.
+
+        Семантический кэш опционален: ошибка embedder'а считается промахом.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+            context_key: Ключ из _semantic_context_key
+
+        Returns:
+            (embedding или None при ошибке, закэшированный результат или None)
+
+        """
+        try:
+            vector = await self._embed_for_semantic_cache(messages_list)
+            return vector, self._semantic_lookup(vector, context_key)
+        except Exception as e:
+            logger.warning("Семантический кэш недоступен", model=self.model_name, error=str(e))
+            return None, None
+
+    async def _complete(
+        self,
+        messages_list: list[dict[str, Any]],
+        litellm_params: dict[str, Any],
+        metadata: dict[str, Any] | None,
+    ) -> GenerationResult:
+        """Выполнить запрос к API без кэшей.
+
+        Args:
+            messages_list: Сообщения в формате LiteLLM
+            litellm_params: Параметры LiteLLM
+            metadata: Метаданные для Langfuse
+
+        Returns:
+            Результат генерации
+
+        """
+        logger.debug("LiteLLM генерация", model=self.model_name, messages=len(messages_list))
+
+        completion_kwargs = self._build_request_kwargs(
+            messages_list,
+            litellm_params,
+            stream=False,
+            metadata=metadata,
+        )
+
+        response: ModelResponse = await self._acompletion_with_retry(completion_kwargs)
+
+        choice = response.choices[0]
+        text = choice.message.content or ""
+        finish_reason = self._map_finish_reason(choice.finish_reason)
+        usage = self._extract_usage(response)
+
+        logger.debug(
+            "LiteLLM генерация завершена",
+            model=self.model_name,
+            tokens=usage["total_tokens"],
+            cached_tokens=usage["cached_tokens"],
+            finish=finish_reason,
+        )
+
+        return GenerationResult(
+            text=text,
+            finish_reason=finish_reason,
+            usage=usage,
+            model=response.model or self.model_name,
+            extra={"provider": self._response_provider(response)},
+        )
+
+    async def generate_batch(
+        self,
+        prompts: list[str],
+        params: GenerationParams | None = None,
+    ) -> list[GenerationResult]:
+        """Сгенерировать ответы для нескольких промптов.
+
+        Одинаковые промпты для провайдеров с поддержкой n= отправляются одним
+        HTTP запросом; в остальных случаях запросы выполняются параллельно,
+        не более max_concurrency одновременно.
+
+        Args:
+            prompts: Список промптов
+            params: Параметры генерации (общие для всех промптов)
+
+        Returns:
+            Результаты в порядке промптов
+
+        Raises:
+            RuntimeError: Если генерация не удалась
+
+        """
+        if not prompts:
+            return []
+
+        if len(prompts) > 1 and self._llm_provider in _SUPPORTS_N and len(set(prompts)) == 1:
+            results = await self._generate_n(prompts[0], len(prompts), params)
+            if results is not None:
+                return results
+
+        return await self.generate_many([{"prompt": prompt, "params": params} for prompt in prompts])
 
-            logger.debug(
-                f"LiteLLM генерация завершена: tokens={usage['total_tokens']}, "
-                f"finish={finish_reason}"
+    @overload
+    async def generate_many(
+        self,
+        requests: list[dict[str, Any]],
+        return_exceptions: Literal[False] = False,
+    ) -> list[GenerationResult]: ...
+
+    @overload
+    async def generate_many(
+        self,
+        requests: list[dict[str, Any]],
+        return_exceptions: Literal[True],
+    ) -> list[GenerationResult | BaseException]: ...
+
+    async def generate_many(
+        self,
+        requests: list[dict[str, Any]],
+        return_exceptions: bool = False,
+    ) -> list[GenerationResult] | list[GenerationResult | BaseException]:
+        """Выполнить несколько независимых запросов generate параллельно.
+
+        Не более max_concurrency запросов выполняются одновременно.
+
+        Args:
+            requests: Аргументы generate для каждого запроса
+                (prompt, messages, params, metadata)
+            return_exceptions: Возвращать исключения на месте результатов
+                вместо прерывания всей пачки на первой ошибке
+
+        Returns:
+            Результаты (или исключения) в порядке requests
+
+        Raises:
+            RuntimeError: Если генерация не удалась и return_exceptions=False
+
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _generate_one(request: dict[str, Any]) -> GenerationResult:
+            async with semaphore:
+                return await self.generate(**request)
+
+        return list(
+            await asyncio.gather(
+                *(_generate_one(request) for request in requests),
+                return_exceptions=return_exceptions,
             )
+        )
+
+    async def _generate_n(
+        self,
+        prompt: str,
+        count: int,
+        params: GenerationParams | None,
+    ) -> list[GenerationResult] | None:
+        """Получить count ответов на один промпт одним запросом через n=.
+
+        Usage запроса целиком относится к первому результату, у остальных
+        он нулевой, чтобы сумма по результатам совпадала с тарифицированной.
 
-            return GenerationResult(
-                text=text,
-                finish_reason=finish_reason,
-                usage=usage,
-                model=response.model or self.model_name,
-                extra={"provider": getattr(response, "_hidden_params", {}).get("custom_llm_provider", "unknown")},
+        Args:
+            prompt: Промпт
+            count: Количество ответов
+            params: Параметры генерации
+
+        Returns:
+            Список из count результатов или None, если провайдер вернул другое
+            число вариантов (молча ограничил или проигнорировал n)
+
+        Raises:
+            RuntimeError: Если генерация не удалась
+
+        """
+        try:
+            completion_kwargs = self._build_request_kwargs(
+                self._prepare_messages(prompt=prompt),
+                self._prepare_params(params),
+                stream=False,
             )
+            completion_kwargs["n"] = count
+
+            response: ModelResponse = await self._acompletion_with_retry(completion_kwargs)
+            if len(response.choices) != count:
+                logger.warning(
+                    "Провайдер вернул другое число вариантов n, batch выполняется поштучно",
+                    model=self.model_name,
+                    requested=count,
+                    received=len(response.choices),
+                )
+                return None
+
+            usage = self._extract_usage(response)
+            provider = self._response_provider(response)
+            return [
+                GenerationResult(
+                    text=choice.message.content or "",
+                    finish_reason=self._map_finish_reason(choice.finish_reason),
+                    usage=usage if index == 0 else _ZERO_USAGE,
+                    model=response.model or self.model_name,
+                    extra={"provider": provider},
+                )
+                for index, choice in enumerate(response.choices)
+            ]
 
         except Exception as e:
-            logger.error(f"Ошибка генерации LiteLLM: {e}")
+            logger.error("Ошибка batch генерации LiteLLM", model=self.model_name, error=str(e))
             msg = f"Ошибка генерации LiteLLM: {e}"
             raise RuntimeError(msg) from e
 
@@ -280,52 +1104,90 @@ class LiteLLMProvider:
             messages_list = self._prepare_messages(prompt, messages)
             litellm_params = self._prepare_params(params)
 
-            logger.debug(f"LiteLLM stream: model={self.model_name}, messages={len(messages_list)}")
-
-            stream_kwargs: dict[str, Any] = {
-                "model": self.model_name,
-                "messages": messages_list,
-                "api_key": self.api_key,
-                "base_url": self.base_url,
-                "timeout": self.timeout,
-                "stream": True,
-                **litellm_params,
-                **self.extra_params,
-            }
-
-            if self.keep_alive is not None:
-                stream_kwargs["keep_alive"] = self.keep_alive
-
-            response = await acompletion(**stream_kwargs)
-            accumulated_tokens = 0
-
-            async for chunk in response:
-                delta = chunk.choices[0].delta
-                text = getattr(delta, "content", "") or ""
-                finish_reason = chunk.choices[0].finish_reason
-                is_final = finish_reason is not None
-
-                if text:
-                    accumulated_tokens += len(text.split())
-
-                yield StreamChunk(
-                    text=text,
-                    finish_reason=self._map_finish_reason(finish_reason) if is_final else None,
-                    usage=(
-                        {
+            logger.debug("LiteLLM stream", model=self.model_name, messages=len(messages_list))
+
+            stream_kwargs = self._build_request_kwargs(messages_list, litellm_params, stream=True)
+            stream_kwargs["stream_options"] = {"include_usage": True}
+
+            response = await self._acompletion_with_retry(stream_kwargs)
+            # Поток закрывается явно (в т.ч. при отключении клиента или
+            # ошибке), чтобы соединение вернулось в общий пул httpx.
+            try:
+                accumulated_tokens = 0
+                exact_usage: dict[str, int] | None = None
+                final_text = ""
+                final_reason: str | None = None
+
+                coalesce = self.stream_coalesce_interval > 0
+                loop = asyncio.get_running_loop()
+                pending_parts: list[str] = []
+                last_yield = loop.time()
+
+                async for chunk in response:
+                    chunk_usage = self._extract_stream_usage(chunk)
+                    if chunk_usage is not None:
+                        exact_usage = chunk_usage
+
+                    # При include_usage провайдер может прислать отдельный chunk
+                    # только с usage и без choices.
+                    choices = chunk.choices
+                    if not choices:
+                        continue
+
+                    choice = choices[0]
+                    text = getattr(choice.delta, "content", "") or ""
+
+                    if text:
+                        accumulated_tokens += text.count(" ") + 1
+
+                    if choice.finish_reason is not None:
+                        # Финальный chunk отдаём после конца потока, чтобы
+                        # приложить точный usage, если он пришёл позже.
+                        final_text = "".join(pending_parts) + text
+                        pending_parts.clear()
+                        final_reason = choice.finish_reason
+                        continue
+
+                    if not coalesce:
+                        yield StreamChunk(text=text)
+                        continue
+
+                    # Мелкие дельты склеиваются, чтобы не будить потребителя на
+                    # каждый токен: chunk отдаётся по таймеру или по числу частей.
+                    if text:
+                        pending_parts.append(text)
+
+                    now = loop.time()
+                    if pending_parts and (
+                        len(pending_parts) >= self.stream_coalesce_max_parts
+                        or now - last_yield >= self.stream_coalesce_interval
+                    ):
+                        yield StreamChunk(text="".join(pending_parts))
+                        pending_parts.clear()
+                        last_yield = now
+
+                if pending_parts:
+                    yield StreamChunk(text="".join(pending_parts))
+
+                if final_reason is not None:
+                    yield StreamChunk(
+                        text=final_text,
+                        finish_reason=self._map_finish_reason(final_reason),
+                        usage=exact_usage
+                        or {
                             "prompt_tokens": 0,
                             "completion_tokens": accumulated_tokens,
                             "total_tokens": accumulated_tokens,
-                        }
-                        if is_final
-                        else None
-                    ),
-                )
+                            "cached_tokens": 0,
+                        },
+                    )
 
-            logger.debug(f"LiteLLM stream завершён: tokens≈{accumulated_tokens}")
+                logger.debug("LiteLLM stream завершён", model=self.model_name, tokens=accumulated_tokens)
+            finally:
+                await self._close_stream(response)
 
         except Exception as e:
-            logger.error(f"Ошибка LiteLLM stream: {e}")
+            logger.error("Ошибка LiteLLM stream", model=self.model_name, error=str(e))
             msg = f"Ошибка LiteLLM stream: {e}"
             raise RuntimeError(msg) from e
 
@@ -336,34 +1198,41 @@ class LiteLLMProvider:
             Информация о модели с возможностями и ограничениями
 
         Note:
-            LiteLLM не предоставляет прямого API для метаданных модели,
-            поэтому возвращаем разумные значения по умолчанию на основе имени модели.
+            Метаданные вычисляются один раз в __init__ (_resolve_model_info).
+
+        """
+        return self._model_info
+
+    def _resolve_llm_provider(self) -> str | None:
+        """Определить провайдера LiteLLM для модели.
+
+        Returns:
+            Имя провайдера (openai, anthropic, ...) или None если не удалось определить
 
         """
-        context_window = 4096
-        max_output = 2048
+        try:
+            _, provider, _, _ = litellm.get_llm_provider(model=self.model_name, api_base=self.base_url)
+        except Exception:
+            return None
+        return provider
+
+    def _resolve_model_info(self) -> ModelInfo:
+        """Определить метаданные модели по её имени.
+
+        LiteLLM не предоставляет прямого API для метаданных модели,
+        поэтому используем разумные значения по умолчанию из _MODEL_LIMITS.
+
+        Returns:
+            Информация о модели с возможностями и ограничениями
 
+        """
         model_lower = self.model_name.lower()
+        context_window, max_output = _DEFAULT_MODEL_LIMITS
 
-        if "claude-3" in model_lower:
-            context_window = 200000
-            max_output = 4096
-        elif "claude-2" in model_lower:
-            context_window = 100000
-            max_output = 4096
-        elif "gpt-4" in model_lower:
-            if "turbo" in model_lower or "1106" in model_lower or "0125" in model_lower:
-                context_window = 128000
-                max_output = 4096
-            else:
-                context_window = 8192
-                max_output = 4096
-        elif "gpt-3.5" in model_lower:
-            context_window = 16384 if "16k" in model_lower else 4096
-            max_output = 4096
-        elif "gemini" in model_lower or "mistral" in model_lower:
-            context_window = 32000
-            max_output = 8192
+        for markers, limits in _MODEL_LIMITS:
+            if all(any(marker in model_lower for marker in group) for group in markers):
+                context_window, max_output = limits
+                break
 
         return ModelInfo(
             name=self.model_name,
@@ -387,19 +1256,87 @@ class LiteLLMProvider:
             True если провайдер работает
 
         Note:
-            Выполняет минимальный тестовый запрос для проверки подключения.
+            Не тратит генерацию: для base_url опрашивает эндпоинт /models,
+            для облачных провайдеров проверяет наличие ключей через
+            litellm.validate_environment. Результат кэшируется на
+            health_ttl секунд; параллельные вызовы ждут одну общую проверку.
 
         """
-        try:
-            await self.generate(
-                messages=[ChatMessage(role="user", content="Hi")],
-                params=GenerationParams(max_tokens=1, temperature=0.0),
+        cached = self._get_cached_health()
+        if cached is not None:
+            return cached
+
+        async with self._health_lock:
+            cached = self._get_cached_health()
+            if cached is not None:
+                return cached
+
+            try:
+                is_healthy = await self._probe_health()
+            except Exception as e:
+                logger.warning("Проверка работоспособности LiteLLM не удалась", model=self.model_name, error=str(e))
+                is_healthy = False
+
+            self._health_cache = (time.monotonic(), is_healthy)
+            return is_healthy
+
+    async def _probe_health(self) -> bool:
+        """Выполнить дешёвую проверку провайдера без генерации токенов.
+
+        Для base_url проверяется только то, что хост отвечает по HTTP и не
+        отклоняет ключ: 404/405 на /models считаются нормой, поэтому
+        неверный путь (например, Ollama без /v1) эта проверка не выявит.
+
+        Returns:
+            True если провайдер доступен и сконфигурирован
+
+        """
+        if self.base_url:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+            # Короткий таймаут: проверка выполняется под _health_lock, и
+            # зависший хост не должен блокировать readiness probes на timeout запросов
+            response = await get_shared_http_client(self.timeout).get(
+                f"{self.base_url.rstrip('/')}/models",
+                headers=headers,
+                timeout=DEFAULT_LITELLM_HEALTH_PROBE_TIMEOUT,
+            )
+            # 404/405 допустимы: не все OpenAI-совместимые серверы реализуют
+            # /models. 401/403 и прочие ошибки означают, что запросы не пройдут.
+            if response.status_code < 400 or response.status_code in (404, 405):
+                return True
+            logger.warning(
+                "LiteLLM: /models вернул ошибку",
+                model=self.model_name,
+                status_code=response.status_code,
             )
-            return True
-        except Exception as e:
-            logger.warning(f"Проверка работоспособности LiteLLM не удалась для {self.model_name}: {e}")
             return False
 
+        environment = litellm.validate_environment(model=self.model_name, api_key=self.api_key)
+        if not environment.get("keys_in_environment", False):
+            logger.warning(
+                "LiteLLM: отсутствуют ключи провайдера",
+                model=self.model_name,
+                missing_keys=environment.get("missing_keys"),
+            )
+            return False
+        return True
+
+    def _get_cached_health(self) -> bool | None:
+        """Вернуть закэшированный результат health_check, если он не устарел.
+
+        Returns:
+            Результат последней проверки или None если кэш пуст/устарел
+
+        """
+        if self._health_cache is None:
+            return None
+
+        checked_at, is_healthy = self._health_cache
+        if time.monotonic() - checked_at >= self.health_ttl:
+            return None
+
+        return is_healthy
+
     async def cleanup(self) -> None:
         """Очистить ресурсы.
 
@@ -407,4 +1344,4 @@ class LiteLLMProvider:
             LiteLLM не имеет состояния, поэтому очистка не требуется.
 
         """
-        logger.debug(f"LiteLLM provider cleanup: {self.model_name}")
+        logger.debug("LiteLLM provider cleanup", model=self.model_name)
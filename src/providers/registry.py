@@ -4,9 +4,15 @@
 Поддерживает как LLM providers, так и Embedding providers.
 """
 
+import asyncio
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
+
+from src.core.config import settings
 from src.providers.base import ModelInfo
+from src.providers.litellm_provider import LiteLLMProvider
 from src.shared.logging import get_logger
 
 if TYPE_CHECKING:
@@ -15,6 +21,30 @@ if TYPE_CHECKING:
 logger = get_logger()
 
 
+def _make_semantic_embedder(model_name: str) -> Callable[[str], Awaitable[np.ndarray]]:
+    """Создать embedder для семантического кэша LiteLLMProvider.
+
+    Модель загружается через EmbeddingManager при первом обращении,
+    поэтому кэш не держит отдельную копию модели.
+
+    Args:
+        model_name: Название embedding пресета
+
+    Returns:
+        Асинхронная функция text -> embedding
+
+    """
+
+    async def embed(text: str) -> np.ndarray:
+        from src.services.embedding_manager import get_embedding_manager
+
+        provider = await get_embedding_manager().get_or_load(model_name)
+        embeddings = await provider.generate_embeddings([text], as_numpy=True)
+        return embeddings[0]
+
+    return embed
+
+
 class ProviderRegistry:
     """Registry для управления LLM и Embedding providers.
 
@@ -148,7 +178,7 @@ class ProviderRegistry:
 
         return provider
 
-    def _create_cloud_provider(self, preset: Any) -> Any:
+    def _create_cloud_provider(self, preset: Any) -> LiteLLMProvider:
         """Создать LiteLLMProvider из CloudModelPreset.
 
         Args:
@@ -158,9 +188,10 @@ class ProviderRegistry:
             LiteLLMProvider instance
 
         """
-        from src.providers.litellm_provider import LiteLLMProvider
-
         config = preset.to_register_config()
+        if settings.litellm_semantic_cache_model:
+            config.setdefault("semantic_embedder", _make_semantic_embedder(settings.litellm_semantic_cache_model))
+            config.setdefault("semantic_threshold", settings.litellm_semantic_cache_threshold)
         return LiteLLMProvider(**config)
 
     def list_providers(self) -> list[str]:
@@ -182,59 +213,72 @@ class ProviderRegistry:
             Embedding провайдеры пропускаются (они не имеют get_model_info).
 
         """
-        models_info: dict[str, ModelInfo] = {}
-
-        for name, provider in self._providers.items():
-            if not hasattr(provider, "get_model_info"):
-                continue
+        names = [name for name, provider in self._providers.items() if hasattr(provider, "get_model_info")]
+        results = await asyncio.gather(
+            *(self._providers[name].get_model_info() for name in names),
+            return_exceptions=True,
+        )
 
-            try:
-                info = await provider.get_model_info()
-                models_info[name] = info
-            except Exception as e:
-                logger.exception(
+        models_info: dict[str, ModelInfo] = {}
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
                     "Не удалось получить info для модели",
                     model=name,
-                    error=str(e),
+                    error=str(result),
                 )
+                continue
+            models_info[name] = result
 
         return models_info
 
     async def health_check_all(self) -> dict[str, bool]:
         """Проверить доступность всех providers.
 
+        Проверки выполняются параллельно, поэтому общее время
+        определяется самым медленным provider.
+
         Returns:
             Словарь {provider_name: is_healthy}
 
         """
-        health_status: dict[str, bool] = {}
+        names = list(self._providers)
+        results = await asyncio.gather(
+            *(self._providers[name].health_check() for name in names),
+            return_exceptions=True,
+        )
 
-        for name, provider in self._providers.items():
-            try:
-                is_healthy = await provider.health_check()
-                health_status[name] = is_healthy
-            except Exception as e:
-                logger.exception(
+        health_status: dict[str, bool] = {}
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
                     "Health check failed для provider",
                     provider=name,
-                    error=str(e),
+                    error=str(result),
                 )
                 health_status[name] = False
+                continue
+            health_status[name] = result
 
         return health_status
 
     async def cleanup_all(self) -> None:
         """Очистить ресурсы всех providers (при shutdown)."""
-        for name, provider in self._providers.items():
-            try:
-                await provider.cleanup()
-                logger.info("Provider cleanup выполнен", name=name)
-            except Exception as e:
-                logger.exception(
+        names = list(self._providers)
+        results = await asyncio.gather(
+            *(self._providers[name].cleanup() for name in names),
+            return_exceptions=True,
+        )
+
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
                     "Ошибка cleanup для provider",
                     provider=name,
-                    error=str(e),
+                    error=str(result),
                 )
+                continue
+            logger.info("Provider cleanup выполнен", name=name)
 
     def __len__(self) -> int:
         """Количество зарегистрированных providers."""
@@ -5,9 +5,12 @@ Redis wrapper для управления историей диалогов (mul
 Redis Schema:
     conversation:{conv_id}          -> Hash (metadata: model, created_at, updated_at, etc.)
     conversation:{conv_id}:messages -> List (сообщения в формате JSON)
-    conversations:index             -> Set (все conversation_id)
+    conversations:index:created     -> Sorted Set (conversation_id, score = время создания)
 """
 
+import copy
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime
 from typing import Any
 from uuid import uuid4
@@ -17,9 +20,12 @@ from redis.asyncio import Redis
 
 from src.core.constants import (
     DEFAULT_CONTEXT_MESSAGES_LIMIT,
+    DEFAULT_CONVERSATION_META_CACHE_SIZE,
+    DEFAULT_CONVERSATION_META_CACHE_TTL,
     DEFAULT_CONVERSATION_TTL,
     DEFAULT_MAX_CONVERSATION_MESSAGES,
     REDIS_CONVERSATION_INDEX_KEY,
+    REDIS_CONVERSATION_LEGACY_INDEX_KEY,
     REDIS_CONVERSATION_PREFIX,
 )
 from src.providers.base import ChatMessage
@@ -27,6 +33,38 @@ from src.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Атомарное добавление сообщения: проверка существования, RPUSH, LTRIM,
+# обновление метаданных и TTL выполняются на сервере за один EVALSHA.
+# KEYS: conv_key, messages_key; ARGV: message_json, max_messages, now, ttl.
+# Возвращает новое количество сообщений или -1 если диалога нет.
+_ADD_MESSAGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+local count = redis.call('LLEN', KEYS[2])
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[3], 'message_count', tostring(count))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return count
+"""
+
+# Условное обновление метаданных без отдельного EXISTS round-trip.
+# KEYS: conv_key[, messages_key]; ARGV: пары field, value для HSET.
+# Если передан messages_key, список сообщений удаляется (clear_messages).
+# Возвращает 1 если диалог обновлён, 0 если диалога нет.
+_UPDATE_CONVERSATION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if KEYS[2] then
+    redis.call('UNLINK', KEYS[2])
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
 
 class ConversationStore:
     """Redis-based storage для multi-turn conversations.
@@ -36,6 +74,9 @@ class ConversationStore:
     - Добавление сообщений в историю
     - Получение контекста для LLM запросов
     - TTL для автоматической очистки старых диалогов
+
+    Связанные команды отправляются через pipeline или Lua скрипт, чтобы
+    операция стоила один round-trip до Redis вместо нескольких.
     """
 
     def __init__(self, redis_client: Redis) -> None:
@@ -50,6 +91,16 @@ class ConversationStore:
         self.max_messages = DEFAULT_MAX_CONVERSATION_MESSAGES
         self.context_limit = DEFAULT_CONTEXT_MESSAGES_LIMIT
 
+        # Короткоживущий LRU кэш метаданных: повторные get_conversation в
+        # рамках одного запроса не ходят в Redis. Записи этого процесса
+        # инвалидируют кэш сразу, изменения других инстансов видны через TTL.
+        self.meta_cache_size = DEFAULT_CONVERSATION_META_CACHE_SIZE
+        self.meta_cache_ttl = DEFAULT_CONVERSATION_META_CACHE_TTL
+        self._meta_cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+        self._add_message_script = self.redis.register_script(_ADD_MESSAGE_SCRIPT)
+        self._update_conversation_script = self.redis.register_script(_UPDATE_CONVERSATION_SCRIPT)
+
     def _conv_key(self, conversation_id: str) -> str:
         """Получить ключ для метаданных диалога."""
         return f"{REDIS_CONVERSATION_PREFIX}{conversation_id}"
@@ -58,6 +109,11 @@ class ConversationStore:
         """Получить ключ для сообщений диалога."""
         return f"{REDIS_CONVERSATION_PREFIX}{conversation_id}:messages"
 
+    @staticmethod
+    def _encode_message(role: str, content: str, timestamp: str) -> bytes:
+        """Сериализовать сообщение для хранения в Redis списке."""
+        return orjson.dumps({"role": role, "content": content, "timestamp": timestamp})
+
     async def create_conversation(
         self,
         model: str | None = None,
@@ -81,7 +137,7 @@ class ConversationStore:
 
         now = datetime.now(UTC).isoformat()
 
-        conv_data: dict[str, str] = {
+        conv_data: dict[str, str | bytes] = {
             "conversation_id": conversation_id,
             "created_at": now,
             "updated_at": now,
@@ -93,27 +149,23 @@ class ConversationStore:
 
         if system_prompt:
             conv_data["system_prompt"] = system_prompt
+            # Системный промпт сразу становится первым сообщением
+            conv_data["message_count"] = "1"
 
         if metadata:
-            conv_data["metadata"] = orjson.dumps(metadata).decode("utf-8")
+            conv_data["metadata"] = orjson.dumps(metadata)
 
-        # Сохранить метаданные
-        await self.redis.hset(conv_key, mapping=conv_data)  # type: ignore[arg-type]
-        await self.redis.expire(conv_key, self.conversation_ttl)  # type: ignore[misc]
+        # Все команды создания уходят в Redis одним round-trip
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(conv_key, mapping=conv_data)  # type: ignore[arg-type]
+        pipe.expire(conv_key, self.conversation_ttl)
+        pipe.zadd(REDIS_CONVERSATION_INDEX_KEY, {conversation_id: time.time()})
 
-        # Инициализировать пустой список сообщений
-        await self.redis.expire(messages_key, self.conversation_ttl)  # type: ignore[misc]
-
-        # Добавить в индекс
-        await self.redis.sadd(REDIS_CONVERSATION_INDEX_KEY, conversation_id)  # type: ignore[misc]
-
-        # Если есть системный промпт, добавить как первое сообщение
         if system_prompt:
-            await self.add_message(
-                conversation_id,
-                role="system",
-                content=system_prompt,
-            )
+            pipe.rpush(messages_key, self._encode_message("system", system_prompt, now))
+            pipe.expire(messages_key, self.conversation_ttl)
+
+        await pipe.execute()
 
         logger.info(
             "Диалог создан",
@@ -134,19 +186,61 @@ class ConversationStore:
             Метаданные диалога или None если не найден
 
         """
+        entry = self._meta_cache.get(conversation_id)
+        if entry is not None:
+            if time.monotonic() - entry[0] < self.meta_cache_ttl:
+                self._meta_cache.move_to_end(conversation_id)
+                return copy.deepcopy(entry[1])
+            del self._meta_cache[conversation_id]
+
         conv_key = self._conv_key(conversation_id)
         data = await self.redis.hgetall(conv_key)  # type: ignore[misc]
 
-        if not data:
-            return None
+        result = self._decode_conv_hash(data)
+        if result is not None:
+            self._cache_meta(conversation_id, result)
+        return result
 
-        result = {k.decode("utf-8"): v.decode("utf-8") for k, v in data.items()}
+    def _cache_meta(self, conversation_id: str, meta: dict[str, Any]) -> None:
+        """Сохранить метаданные диалога в LRU кэш."""
+        if self.meta_cache_size <= 0:
+            return
 
-        if "metadata" in result:
-            result["metadata"] = orjson.loads(result["metadata"])
+        # Глубокая копия: вложенный metadata не должен разделяться с вызывающим кодом
+        self._meta_cache[conversation_id] = (time.monotonic(), copy.deepcopy(meta))
+        self._meta_cache.move_to_end(conversation_id)
+        while len(self._meta_cache) > self.meta_cache_size:
+            self._meta_cache.popitem(last=False)
 
-        if "message_count" in result:
-            result["message_count"] = int(result["message_count"])
+    def _invalidate_meta(self, conversation_id: str) -> None:
+        """Удалить метаданные диалога из кэша после изменения."""
+        self._meta_cache.pop(conversation_id, None)
+
+    @staticmethod
+    def _decode_conv_hash(data: dict[bytes, bytes]) -> dict[str, Any] | None:
+        """Декодировать hash метаданных диалога из Redis.
+
+        Args:
+            data: Результат HGETALL
+
+        Returns:
+            Метаданные диалога или None если hash пуст
+
+        """
+        if not data:
+            return None
+
+        # metadata и message_count разбираются прямо из bytes, без
+        # промежуточной str копии.
+        result: dict[str, Any] = {}
+        for raw_key, value in data.items():
+            key = raw_key.decode("utf-8")
+            if key == "metadata":
+                result[key] = orjson.loads(value)
+            elif key == "message_count":
+                result[key] = int(value)
+            else:
+                result[key] = value.decode("utf-8")
 
         return result
 
@@ -160,16 +254,17 @@ class ConversationStore:
             True если диалог был удалён
 
         """
-        conv_key = self._conv_key(conversation_id)
-        messages_key = self._messages_key(conversation_id)
-
-        exists = await self.redis.exists(conv_key)
-        if not exists:
+        # Существование определяется по результату UNLINK: один round-trip
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.unlink(self._conv_key(conversation_id))
+        pipe.unlink(self._messages_key(conversation_id))
+        pipe.zrem(REDIS_CONVERSATION_INDEX_KEY, conversation_id)
+        deleted, _, _ = await pipe.execute()
+        self._invalidate_meta(conversation_id)
+
+        if not deleted:
             return False
 
-        await self.redis.delete(conv_key, messages_key)
-        await self.redis.srem(REDIS_CONVERSATION_INDEX_KEY, conversation_id)  # type: ignore[misc]
-
         logger.info("Диалог удалён", conversation_id=conversation_id)
         return True
 
@@ -190,32 +285,22 @@ class ConversationStore:
             True если сообщение добавлено
 
         """
-        conv_key = self._conv_key(conversation_id)
-        messages_key = self._messages_key(conversation_id)
+        now = datetime.now(UTC).isoformat()
 
-        exists = await self.redis.exists(conv_key)
-        if not exists:
+        message_count = await self._add_message_script(
+            keys=[self._conv_key(conversation_id), self._messages_key(conversation_id)],
+            args=[
+                self._encode_message(role, content, now),
+                self.max_messages,
+                now,
+                self.conversation_ttl,
+            ],
+        )
+        if message_count < 0:
             logger.warning("Диалог не найден", conversation_id=conversation_id)
             return False
 
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
-        message_json = orjson.dumps(message).decode("utf-8")
-
-        await self.redis.rpush(messages_key, message_json)  # type: ignore[misc]
-        await self.redis.ltrim(messages_key, -self.max_messages, -1)  # type: ignore[misc]
-
-        message_count = await self.redis.llen(messages_key)  # type: ignore[misc]
-        await self.redis.hset(conv_key, mapping={  # type: ignore[arg-type]
-            "updated_at": datetime.now(UTC).isoformat(),
-            "message_count": str(message_count),
-        })
-
-        await self.redis.expire(conv_key, self.conversation_ttl)  # type: ignore[misc]
-        await self.redis.expire(messages_key, self.conversation_ttl)  # type: ignore[misc]
+        self._invalidate_meta(conversation_id)
 
         logger.debug(
             "Сообщение добавлено",
@@ -317,18 +402,13 @@ class ConversationStore:
             True если история очищена
 
         """
-        conv_key = self._conv_key(conversation_id)
-        messages_key = self._messages_key(conversation_id)
-
-        exists = await self.redis.exists(conv_key)
-        if not exists:
+        updated = await self._update_conversation_script(
+            keys=[self._conv_key(conversation_id), self._messages_key(conversation_id)],
+            args=["updated_at", datetime.now(UTC).isoformat(), "message_count", "0"],
+        )
+        if not updated:
             return False
-
-        await self.redis.delete(messages_key)
-        await self.redis.hset(conv_key, mapping={  # type: ignore[arg-type]
-            "updated_at": datetime.now(UTC).isoformat(),
-            "message_count": "0",
-        })
+        self._invalidate_meta(conversation_id)
 
         logger.info("История диалога очищена", conversation_id=conversation_id)
         return True
@@ -345,23 +425,24 @@ class ConversationStore:
             offset: Смещение для пагинации
 
         Returns:
-            Список метаданных диалогов
+            Список метаданных диалогов (новые первыми)
 
         """
-        all_ids = await self.redis.smembers(REDIS_CONVERSATION_INDEX_KEY)  # type: ignore[misc]
-        conversation_ids = sorted(
-            [cid.decode("utf-8") for cid in all_ids],
-            reverse=True,
-        )
+        # Индекс упорядочен Redis по времени создания: читается только страница
+        paginated_ids = [
+            cid.decode("utf-8")
+            for cid in await self.redis.zrevrange(REDIS_CONVERSATION_INDEX_KEY, offset, offset + limit - 1)
+        ]
+        if not paginated_ids:
+            return []
 
-        paginated_ids = conversation_ids[offset : offset + limit]
-        conversations = []
+        # Метаданные страницы читаются одним pipeline вместо HGETALL на диалог
+        pipe = self.redis.pipeline(transaction=False)
         for conv_id in paginated_ids:
-            conv = await self.get_conversation(conv_id)
-            if conv:
-                conversations.append(conv)
+            pipe.hgetall(self._conv_key(conv_id))
+        results = await pipe.execute()
 
-        return conversations
+        return [conv for conv in map(self._decode_conv_hash, results) if conv is not None]
 
     async def update_conversation(
         self,
@@ -382,13 +463,7 @@ class ConversationStore:
             True если диалог обновлён
 
         """
-        conv_key = self._conv_key(conversation_id)
-
-        exists = await self.redis.exists(conv_key)
-        if not exists:
-            return False
-
-        update_data: dict[str, str] = {
+        update_data: dict[str, str | bytes] = {
             "updated_at": datetime.now(UTC).isoformat(),
         }
 
@@ -399,13 +474,57 @@ class ConversationStore:
             update_data["system_prompt"] = system_prompt
 
         if metadata is not None:
-            update_data["metadata"] = orjson.dumps(metadata).decode("utf-8")
+            update_data["metadata"] = orjson.dumps(metadata)
 
-        await self.redis.hset(conv_key, mapping=update_data)  # type: ignore[arg-type]
+        updated = await self._update_conversation_script(
+            keys=[self._conv_key(conversation_id)],
+            args=[item for pair in update_data.items() for item in pair],
+        )
+        if not updated:
+            return False
+        self._invalidate_meta(conversation_id)
 
         logger.debug("Диалог обновлён", conversation_id=conversation_id)
         return True
 
+    async def migrate_legacy_index(self) -> int:
+        """Перенести диалоги из старого индекса (Set) в Sorted Set.
+
+        Score берётся из created_at диалога; истёкшие диалоги пропускаются,
+        диалоги с некорректным created_at получают текущее время.
+        Старый ключ удаляется после переноса. Вызывается при старте.
+
+        Returns:
+            Количество перенесённых диалогов
+
+        """
+        legacy_ids = await self.redis.smembers(REDIS_CONVERSATION_LEGACY_INDEX_KEY)  # type: ignore[misc]
+        if not legacy_ids:
+            return 0
+
+        conversation_ids = [cid.decode("utf-8") for cid in legacy_ids]
+        pipe = self.redis.pipeline(transaction=False)
+        for conv_id in conversation_ids:
+            pipe.hget(self._conv_key(conv_id), "created_at")
+        created = await pipe.execute()
+
+        scores: dict[str, float] = {}
+        for conv_id, created_at in zip(conversation_ids, created, strict=True):
+            if not created_at:
+                continue
+            try:
+                scores[conv_id] = datetime.fromisoformat(created_at.decode("utf-8")).timestamp()
+            except (UnicodeDecodeError, ValueError):
+                # Битый created_at не должен ронять старт: диалог попадает в индекс как новый
+                logger.warning("Некорректный created_at диалога при миграции", conversation_id=conv_id)
+                scores[conv_id] = time.time()
+        if scores:
+            await self.redis.zadd(REDIS_CONVERSATION_INDEX_KEY, scores)
+        await self.redis.unlink(REDIS_CONVERSATION_LEGACY_INDEX_KEY)
+
+        logger.info("Индекс диалогов перенесён в Sorted Set", migrated=len(scores))
+        return len(scores)
+
     async def health_check(self) -> bool:
         """Проверить доступность Redis.
 
@@ -1,9 +1,11 @@
-"""Embedding Manager - управление embedding моделями с FIFO eviction.
+"""Embedding Manager - управление embedding моделями с LRU eviction.
 
 Lazy loading embedding моделей с автоматическим вытеснением
-при нехватке VRAM (First In First Out).
+при нехватке VRAM. Первыми вытесняются модели, к которым не было
+повторных обращений (разовые загрузки), затем - давно не использованные.
 """
 
+import asyncio
 from collections import OrderedDict
 from typing import TYPE_CHECKING, Any
 
@@ -16,29 +18,16 @@ if TYPE_CHECKING:
 
 logger = get_logger()
 
-EMBEDDING_VRAM_REQUIREMENTS: dict[str, int] = {
-    "multilingual-e5-large": 2200,
-    "multilingual-e5-base": 1100,
-    "multilingual-e5-small": 500,
-    "all-MiniLM-L6-v2": 300,
-    "all-mpnet-base-v2": 500,
-    "paraphrase-multilingual-MiniLM-L12-v2": 500,
-    "bge-m3": 2500,
-    "bge-large-en-v1.5": 1500,
-    "bge-base-en-v1.5": 500,
-    "jina-embeddings-v2-base-en": 600,
-    "jina-embeddings-v2-small-en": 400,
-}
-
 DEFAULT_VRAM_REQUIREMENT_MB = 1000
 
 
 class EmbeddingManager:
-    """Менеджер embedding моделей с lazy loading и FIFO eviction.
+    """Менеджер embedding моделей с lazy loading и LRU eviction.
 
     Особенности:
     - Lazy loading: модели загружаются при первом запросе
-    - FIFO eviction: при нехватке VRAM удаляется самая старая модель
+    - Eviction: при нехватке VRAM сначала удаляются модели без повторных
+      обращений, затем давно не использованные (упрощённый 2Q)
     - Интеграция с VRAMMonitor для отслеживания памяти
     - Поддержка device selection (cuda/cpu)
 
@@ -67,6 +56,12 @@ class EmbeddingManager:
         self._device = device
         self._max_loaded_models = max_loaded_models
         self._loaded_models: OrderedDict[str, SentenceTransformerProvider] = OrderedDict()
+        # Число повторных обращений к загруженной модели: модели с 0 считаются
+        # "холодными" и вытесняются раньше часто используемых
+        self._reuse_counts: dict[str, int] = {}
+        # Загрузки в процессе: параллельные запросы одной модели ждут
+        # общий Future вместо повторной загрузки (и двойного VRAM)
+        self._loading: dict[str, asyncio.Future[SentenceTransformerProvider | None]] = {}
         self._vram_monitor: Any = None
 
         logger.info(
@@ -89,7 +84,7 @@ class EmbeddingManager:
         """Получить или загрузить embedding модель.
 
         Основной метод для получения embedding провайдеров.
-        При необходимости выполняет FIFO eviction.
+        При необходимости выполняет eviction (см. _evict_one).
 
         Args:
             model_name: Имя модели (должно совпадать с именем пресета)
@@ -104,20 +99,45 @@ class EmbeddingManager:
         """
         if model_name in self._loaded_models:
             self._loaded_models.move_to_end(model_name)
+            self._reuse_counts[model_name] = self._reuse_counts.get(model_name, 0) + 1
             logger.debug("Embedding модель уже загружена", model=model_name)
             return self._loaded_models[model_name]
 
+        pending = self._loading.get(model_name)
+        if pending is not None:
+            # Модель уже загружается другим запросом: ждём его результат.
+            # Ошибка загрузки пробрасывается всем ожидающим; None означает,
+            # что загружавший запрос был отменён, и загрузку нужно повторить.
+            provider = await asyncio.shield(pending)
+            if provider is None:
+                return await self.get_or_load(model_name)
+            self._reuse_counts[model_name] = self._reuse_counts.get(model_name, 0) + 1
+            return provider
+
         preset = self._presets_loader.get_embedding_preset(model_name)
         if preset is None:
             available = self._presets_loader.list_embedding_names()
             msg = f"Embedding модель '{model_name}' не найдена. Доступные: {', '.join(available)}"
             raise KeyError(msg)
 
-        required_mb = self._get_vram_requirement(model_name)
-        await self._ensure_vram_available(required_mb)
+        loading = asyncio.get_running_loop().create_future()
+        self._loading[model_name] = loading
+        try:
+            await self._ensure_vram_available(self._get_vram_requirement(preset))
 
-        provider = await self._load_model(preset)
-        self._loaded_models[model_name] = provider
+            provider = await self._load_model(preset)
+            self._loaded_models[model_name] = provider
+            self._reuse_counts[model_name] = 0
+            loading.set_result(provider)
+        except Exception as e:
+            loading.set_exception(e)
+            # Помечаем исключение полученным: ожидающих может не быть
+            loading.exception()
+            raise
+        finally:
+            self._loading.pop(model_name, None)
+            if not loading.done():
+                loading.set_result(None)
 
         logger.info(
             "Embedding модель загружена",
@@ -127,17 +147,17 @@ class EmbeddingManager:
 
         return provider
 
-    def _get_vram_requirement(self, model_name: str) -> int:
+    def _get_vram_requirement(self, preset: "EmbeddingModelPreset") -> int:
         """Получить требуемый VRAM для модели.
 
         Args:
-            model_name: Имя модели
+            preset: Пресет embedding модели
 
         Returns:
-            Требуемый VRAM в MB
+            Требуемый VRAM в MB (vram_mb из пресета или значение по умолчанию)
 
         """
-        return EMBEDDING_VRAM_REQUIREMENTS.get(model_name, DEFAULT_VRAM_REQUIREMENT_MB)
+        return preset.vram_mb or DEFAULT_VRAM_REQUIREMENT_MB
 
     async def _ensure_vram_available(self, required_mb: int) -> None:
         """Обеспечить наличие свободного VRAM, выполнив eviction если нужно.
@@ -148,7 +168,7 @@ class EmbeddingManager:
         """
         if self._vram_monitor is None or self._device == "cpu":
             while len(self._loaded_models) >= self._max_loaded_models:
-                await self._evict_oldest()
+                await self._evict_one()
             return
 
         eviction_attempts = 0
@@ -165,7 +185,7 @@ class EmbeddingManager:
                 )
                 return
 
-            await self._evict_oldest()
+            await self._evict_one()
             eviction_attempts += 1
 
         logger.warning(
@@ -174,23 +194,39 @@ class EmbeddingManager:
             required_mb=required_mb,
         )
 
-    async def _evict_oldest(self) -> None:
-        """Выгрузить самую старую модель (FIFO).
+    def _select_victim(self) -> str:
+        """Выбрать модель для вытеснения.
+
+        Порядок _loaded_models - от давно использованных к недавним.
+        Сначала ищется самая давняя "холодная" модель (без повторных
+        обращений), чтобы серия разовых загрузок не вытесняла рабочие
+        модели. Если холодных нет - вытесняется самая давняя модель.
+
+        Returns:
+            Имя модели для вытеснения
 
-        Удаляет первый элемент из OrderedDict.
         """
+        for name in self._loaded_models:
+            if not self._reuse_counts.get(name, 0):
+                return name
+        return next(iter(self._loaded_models))
+
+    async def _evict_one(self) -> None:
+        """Выгрузить одну модель согласно политике вытеснения."""
         if not self._loaded_models:
             return
 
-        oldest_name, oldest_provider = self._loaded_models.popitem(last=False)
-        logger.info("FIFO eviction: выгрузка embedding модели", model=oldest_name)
+        victim_name = self._select_victim()
+        victim_provider = self._loaded_models.pop(victim_name)
+        reuse_count = self._reuse_counts.pop(victim_name, 0)
+        logger.info("Eviction: выгрузка embedding модели", model=victim_name, reuse_count=reuse_count)
 
         try:
-            await oldest_provider.cleanup()
+            await victim_provider.cleanup()
         except Exception as e:
             logger.warning(
                 "Ошибка cleanup при eviction",
-                model=oldest_name,
+                model=victim_name,
                 error=str(e),
             )
 
@@ -227,6 +263,7 @@ class EmbeddingManager:
             return False
 
         provider = self._loaded_models.pop(model_name)
+        self._reuse_counts.pop(model_name, None)
 
         try:
             await provider.cleanup()
@@ -248,7 +285,7 @@ class EmbeddingManager:
             await self.unload(model_name)
 
     def list_loaded(self) -> list[str]:
-        """Получить список загруженных моделей (в порядке FIFO).
+        """Получить список загруженных моделей (от давно использованных к недавним).
 
         Returns:
             Список имён загруженных моделей
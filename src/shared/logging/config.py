@@ -77,6 +77,19 @@ def custom_serializer(record: dict[str, Any]) -> str:
     return json_formatter(record)
 
 
+def _json_stdout_sink(message: Any) -> None:
+    """Sink для production: пишет запись в stdout через orjson форматтер.
+
+    Встроенный serialize=True в Loguru использует стандартный json.dumps;
+    этот sink сериализует запись через json_formatter (orjson).
+
+    Args:
+        message: Loguru message (str с атрибутом record)
+
+    """
+    sys.stdout.write(custom_serializer(message.record) + "\n")
+
+
 def setup_logging() -> None:
     """Настроить Loguru для всего приложения с интеграцией Langfuse.
 
@@ -116,10 +129,9 @@ def setup_logging() -> None:
         )
     else:
         logger.add(
-            sys.stdout,
+            _json_stdout_sink,
             format="{message}",
             level=settings.log_level,
-            serialize=True,
             backtrace=True,
             diagnose=False,
             enqueue=True,
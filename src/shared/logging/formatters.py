@@ -7,6 +7,7 @@
 """
 
 import re
+import traceback
 from typing import Any
 
 import orjson
@@ -81,10 +82,12 @@ def json_formatter(record: dict[str, Any]) -> str:
         log_entry["exception"] = {
             "type": exception_info.type.__name__ if exception_info.type else None,
             "value": str(exception_info.value) if exception_info.value else None,
-            "traceback": record.get("exception", {}).get("traceback", None),
+            "traceback": (
+                "".join(traceback.format_tb(exception_info.traceback)) if exception_info.traceback else None
+            ),
         }
 
-    json_str = orjson.dumps(log_entry).decode("utf-8")
+    json_str = orjson.dumps(log_entry, default=str).decode("utf-8")
 
     from src.core.config import settings
 
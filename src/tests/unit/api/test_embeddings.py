@@ -166,3 +166,19 @@ class TestCalculateSimilarity:
             data = response.json()
             assert len(data["text1_preview"]) <= 104  # 100 + "..."
             assert data["text1_preview"].endswith("...")
+
+
+class TestCosineSimilarity:
+    """Tests for _cosine_similarity helper."""
+
+    def test_identical_vectors(self) -> None:
+        """Identical vectors give similarity 1.0."""
+        assert embeddings._cosine_similarity([1.0, 2.0], [1.0, 2.0]) == pytest.approx(1.0)
+
+    def test_opposite_vectors(self) -> None:
+        """Opposite vectors give similarity 0.0."""
+        assert embeddings._cosine_similarity([1.0, 0.0], [-1.0, 0.0]) == pytest.approx(0.0)
+
+    def test_zero_vector_returns_zero(self) -> None:
+        """Zero vector gives 0.0 instead of NaN."""
+        assert embeddings._cosine_similarity([0.0, 0.0], [1.0, 2.0]) == 0.0
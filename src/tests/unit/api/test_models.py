@@ -120,7 +120,7 @@ class TestGetModelInfo:
         mock_env_vars: None,
     ) -> None:
         """Test getting model info triggers lazy loading."""
-        with patch("src.providers.litellm_provider.LiteLLMProvider") as mock_litellm:
+        with patch("src.providers.registry.LiteLLMProvider") as mock_litellm:
             mock_provider = MockLLMProvider(model_name="claude-sonnet-4-20250514")
             mock_litellm.return_value = mock_provider
 
@@ -0,0 +1,83 @@
+"""Tests for WebSocket task.progress debounce."""
+
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.routes import websocket
+from src.api.routes.websocket import (
+    TASK_PROGRESS_MIN_INTERVAL,
+    TASK_PROGRESS_STALE_AFTER,
+    ConnectionManager,
+    broadcast_task_completed,
+    broadcast_task_progress,
+)
+
+
+@pytest.fixture
+def manager() -> Iterator[ConnectionManager]:
+    """Fresh ConnectionManager with mocked broadcast."""
+    instance = ConnectionManager()
+    instance.broadcast = AsyncMock()  # type: ignore[method-assign]
+    with patch.object(websocket, "_connection_manager", instance):
+        yield instance
+
+
+def _patch_clock(now: float):  # noqa: ANN202
+    return patch.object(websocket.time, "monotonic", return_value=now)
+
+
+class TestTaskProgressDebounce:
+    """Tests for broadcast_task_progress debounce."""
+
+    @pytest.mark.asyncio
+    async def test_drops_progress_within_interval(self, manager: ConnectionManager) -> None:
+        """Second counter-only event within the interval is dropped."""
+        with _patch_clock(100.0):
+            await broadcast_task_progress("task-1", 1)
+        with _patch_clock(100.0 + TASK_PROGRESS_MIN_INTERVAL / 2):
+            await broadcast_task_progress("task-1", 2)
+        with _patch_clock(100.0 + TASK_PROGRESS_MIN_INTERVAL):
+            await broadcast_task_progress("task-1", 3)
+
+        sent = [call.args[1]["tokens_generated"] for call in manager.broadcast.await_args_list]
+        assert sent == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_partial_text_bypasses_interval(self, manager: ConnectionManager) -> None:
+        """Events with partial_text are never dropped."""
+        with _patch_clock(100.0):
+            await broadcast_task_progress("task-1", 1)
+            await broadcast_task_progress("task-1", 2, partial_text="Hel")
+            await broadcast_task_progress("task-1", 3, partial_text="Hello")
+
+        assert manager.broadcast.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_interval_is_per_task(self, manager: ConnectionManager) -> None:
+        """Debounce of one task does not affect another."""
+        with _patch_clock(100.0):
+            await broadcast_task_progress("task-1", 1)
+            await broadcast_task_progress("task-2", 1)
+
+        assert manager.broadcast.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_terminal_status_clears_entry(self, manager: ConnectionManager) -> None:
+        """task.completed removes the task's progress entry."""
+        with _patch_clock(100.0):
+            await broadcast_task_progress("task-1", 1)
+        await broadcast_task_completed("task-1", tokens_used=3, duration_ms=12.5)
+
+        assert "task-1" not in manager._last_progress_sent
+
+    @pytest.mark.asyncio
+    async def test_stale_entries_are_pruned(self, manager: ConnectionManager) -> None:
+        """Entries of tasks that never finished are pruned after the bound."""
+        with _patch_clock(100.0):
+            await broadcast_task_progress("lost-task", 1)
+        with _patch_clock(100.0 + TASK_PROGRESS_STALE_AFTER + 1):
+            await broadcast_task_progress("task-2", 1)
+
+        assert list(manager._last_progress_sent) == ["task-2"]
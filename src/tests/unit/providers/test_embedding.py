@@ -0,0 +1,127 @@
+"""Tests for SentenceTransformerProvider embedding cache."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.providers.embedding import SentenceTransformerProvider
+
+
+def _make_provider(cache_size: int = 4) -> SentenceTransformerProvider:
+    """Создать provider с замоканной моделью размерности 3."""
+    provider = SentenceTransformerProvider(model_name="test-model", device="cpu", cache_size=cache_size)
+    provider.dimensions = 3
+    provider.model = MagicMock()
+    provider.model.encode.side_effect = lambda texts, **_: np.array(
+        [[float(len(t)), 0.0, 1.0] for t in texts],
+        dtype=np.float32,
+    )
+    return provider
+
+
+class TestEmbeddingCache:
+    """Tests for the LRU embedding cache."""
+
+    async def test_repeated_texts_are_not_reencoded(self) -> None:
+        """Test cache hit skips model.encode."""
+        provider = _make_provider()
+
+        first = await provider.generate_embeddings(["a", "bb"])
+        second = await provider.generate_embeddings(["bb", "a"])
+
+        assert first == [[1.0, 0.0, 1.0], [2.0, 0.0, 1.0]]
+        assert second == [[2.0, 0.0, 1.0], [1.0, 0.0, 1.0]]
+        assert provider.model.encode.call_count == 1
+
+    async def test_duplicates_in_one_request_encoded_once(self) -> None:
+        """Test duplicate texts within a request are encoded once."""
+        provider = _make_provider()
+
+        result = await provider.generate_embeddings(["a", "a", "ccc"], as_numpy=True)
+
+        assert result.shape == (3, 3)
+        encoded_texts = provider.model.encode.call_args.args[0]
+        assert encoded_texts == ["a", "ccc"]
+
+    async def test_lru_eviction(self) -> None:
+        """Test cache is bounded by cache_size."""
+        provider = _make_provider(cache_size=2)
+
+        await provider.generate_embeddings(["a", "bb", "ccc"])
+
+        assert len(provider._cache) == 2
+
+    async def test_cache_disabled(self) -> None:
+        """Test cache_size=0 always calls the model."""
+        provider = _make_provider(cache_size=0)
+
+        await provider.generate_embeddings(["a"])
+        await provider.generate_embeddings(["a"])
+
+        assert provider.model.encode.call_count == 2
+        assert len(provider._cache) == 0
+
+
+class TestEmbeddingMicroBatching:
+    """Tests for coalescing concurrent encode calls."""
+
+    async def test_concurrent_requests_share_encode_call(self) -> None:
+        """Test requests queued behind a running encode are encoded together."""
+        provider = _make_provider(cache_size=0)
+
+        first, second, third = await asyncio.gather(
+            provider.generate_embeddings(["a"]),
+            provider.generate_embeddings(["bb", "ccc"]),
+            provider.generate_embeddings(["dddd"]),
+        )
+
+        assert first == [[1.0, 0.0, 1.0]]
+        assert second == [[2.0, 0.0, 1.0], [3.0, 0.0, 1.0]]
+        assert third == [[4.0, 0.0, 1.0]]
+        # Первый запрос кодируется сразу, два следующих - одним батчем
+        assert provider.model.encode.call_count == 2
+        assert provider.model.encode.call_args.args[0] == ["bb", "ccc", "dddd"]
+        assert provider._encode_queue == []
+
+    async def test_encode_error_reaches_every_request(self) -> None:
+        """Test an encode failure is raised to all requests in the batch."""
+        provider = _make_provider(cache_size=0)
+        provider.model.encode.side_effect = RuntimeError("boom")
+
+        results = await asyncio.gather(
+            provider.generate_embeddings(["a"]),
+            provider.generate_embeddings(["bb"]),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cancelled_request_keeps_lock_until_encode_finishes(self) -> None:
+        """Test cancelling mid-encode never lets two encodes run concurrently."""
+        provider = _make_provider(cache_size=0)
+        state = {"active": 0, "max_active": 0}
+        state_lock = threading.Lock()
+
+        def slow_encode(texts: list[str], **_: object) -> np.ndarray:
+            with state_lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.05)
+            with state_lock:
+                state["active"] -= 1
+            return np.ones((len(texts), 3), dtype=np.float32)
+
+        provider.model.encode.side_effect = slow_encode
+
+        first = asyncio.create_task(provider.generate_embeddings(["a"]))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        second = await provider.generate_embeddings(["bb"])
+
+        assert second == [[1.0, 1.0, 1.0]]
+        assert first.cancelled()
+        assert state["max_active"] == 1
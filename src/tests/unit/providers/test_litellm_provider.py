@@ -9,10 +9,13 @@
 - Обработку ошибок
 """
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
+import litellm
 import pytest
 
+from src.core.constants import DEFAULT_LITELLM_HEALTH_PROBE_TIMEOUT
 from src.providers.base import ChatMessage, GenerationParams
 from src.providers.litellm_provider import LiteLLMProvider
 
@@ -53,13 +56,20 @@ class TestLiteLLMProviderInit:
         assert provider.timeout == 300
         assert provider.max_retries == 5
 
-    @patch("src.providers.litellm_provider.litellm")
-    def test_init_configures_litellm(self, mock_litellm):
-        """Тестирует что инициализация конфигурирует LiteLLM."""
-        LiteLLMProvider(model_name="gpt-4", max_retries=5, drop_params=False)
+    def test_init_passes_drop_params_per_call(self):
+        """Тестирует что drop_params передаётся в вызов, а не в глобальный litellm."""
+        original = litellm.drop_params
+        provider = LiteLLMProvider(model_name="gpt-4", max_retries=5, drop_params=not original)
 
-        assert mock_litellm.drop_params is False
-        assert mock_litellm.num_retries == 5
+        assert provider._base_kwargs["drop_params"] is (not original)
+        assert litellm.drop_params is original
+
+    def test_init_disables_builtin_retries(self):
+        """Тестирует что встроенные повторы LiteLLM отключены в пользу собственных."""
+        provider = LiteLLMProvider(model_name="gpt-4", max_retries=5)
+
+        assert provider.max_retries == 5
+        assert provider._base_kwargs["num_retries"] == 0
 
 
 class TestPrepareMessages:
@@ -93,6 +103,22 @@ class TestPrepareMessages:
         assert messages[1]["role"] == "user"
         assert messages[2]["role"] == "assistant"
 
+    def test_prepare_marks_system_prefix_for_anthropic(self):
+        """Тестирует что system префикс помечается cache_control для Anthropic."""
+        provider = LiteLLMProvider(model_name="anthropic/claude-3-5-sonnet-20240620")
+
+        chat_messages = [
+            ChatMessage(role="system", content="Static instructions"),
+            ChatMessage(role="user", content="Hello"),
+        ]
+
+        messages = provider._prepare_messages(messages=chat_messages)
+
+        assert messages[0]["content"] == [
+            {"type": "text", "text": "Static instructions", "cache_control": {"type": "ephemeral"}},
+        ]
+        assert messages[1]["content"] == "Hello"
+
     def test_prepare_raises_without_input(self):
         """Тестирует что ValueError поднимается без prompt или messages."""
         provider = LiteLLMProvider(model_name="gpt-4")
@@ -102,6 +128,13 @@ class TestPrepareMessages:
 
         assert "Необходимо указать либо 'prompt', либо 'messages'" in str(exc_info.value)
 
+    def test_prepare_rejects_whitespace_prompt(self):
+        """Тестирует что пробельный prompt не отправляется в API."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        with pytest.raises(ValueError):
+            provider._prepare_messages(prompt="  \n\t ")
+
 
 class TestPrepareParams:
     """Тесты для _prepare_params."""
@@ -193,6 +226,22 @@ class TestExtractUsage:
         assert usage["completion_tokens"] == 20
         assert usage["total_tokens"] == 30
 
+    def test_extract_usage_with_cached_tokens(self):
+        """Тестирует извлечение cached_tokens из prompt_tokens_details."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        mock_response = Mock()
+        mock_response.usage = Mock(
+            prompt_tokens=2048,
+            completion_tokens=10,
+            total_tokens=2058,
+            prompt_tokens_details=Mock(cached_tokens=1920),
+        )
+
+        usage = provider._extract_usage(mock_response)
+
+        assert usage["cached_tokens"] == 1920
+
     def test_extract_usage_without_data(self):
         """Тестирует извлечение usage когда данных нет."""
         provider = LiteLLMProvider(model_name="gpt-4")
@@ -332,6 +381,312 @@ class TestGenerate:
         assert "Ошибка генерации LiteLLM" in str(exc_info.value)
 
 
+@pytest.mark.asyncio
+class TestRetry:
+    """Тесты для повторов с jitter."""
+
+    @patch("src.providers.litellm_provider.asyncio.sleep")
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_retries_rate_limit_then_succeeds(self, mock_acompletion, mock_sleep):
+        """Тестирует повтор после RateLimitError."""
+        provider = LiteLLMProvider(model_name="gpt-4", max_retries=2)
+
+        response = Mock()
+        response.choices = [Mock(message=Mock(content="ok"), finish_reason="stop")]
+        response.model = "gpt-4"
+        response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        rate_limit = litellm.RateLimitError(message="429", llm_provider="openai", model="gpt-4")
+        mock_acompletion.side_effect = [rate_limit, response]
+
+        result = await provider.generate(prompt="Test")
+
+        assert result.text == "ok"
+        assert mock_acompletion.call_count == 2
+        mock_sleep.assert_awaited_once()
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_non_retryable_error_is_not_retried(self, mock_acompletion):
+        """Тестирует что прочие ошибки не повторяются."""
+        provider = LiteLLMProvider(model_name="gpt-4", max_retries=3)
+        mock_acompletion.side_effect = ValueError("bad request")
+
+        with pytest.raises(RuntimeError):
+            await provider.generate(prompt="Test")
+
+        mock_acompletion.assert_called_once()
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+    """Тесты для кэша ответов generate."""
+
+    @staticmethod
+    def _mock_response() -> Mock:
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="Cached"), finish_reason="stop")]
+        mock_response.model = "gpt-4"
+        mock_response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        return mock_response
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_deterministic_request_is_cached(self, mock_acompletion):
+        """Тестирует что повторный запрос с temperature=0 берётся из кэша."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.0)
+
+        first = await provider.generate(prompt="Test", params=params)
+        second = await provider.generate(prompt="Test", params=params)
+
+        assert first.text == second.text == "Cached"
+        mock_acompletion.assert_called_once()
+        assert provider.cache_stats == {"hits": 1, "misses": 1, "semantic_hits": 0}
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_cache_hit_reports_zero_usage(self, mock_acompletion):
+        """Тестирует что ответ из кэша не учитывает токены и помечен cache_hit."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.0)
+
+        first = await provider.generate(prompt="Test", params=params)
+        second = await provider.generate(prompt="Test", params=params)
+
+        assert first.usage["total_tokens"] == 2
+        assert "cache_hit" not in first.extra
+        assert second.usage == {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_tokens": 0}
+        assert second.extra["cache_hit"] is True
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_seeded_sampling_request_is_cached(self, mock_acompletion):
+        """Тестирует что запрос с temperature>0 и фиксированным seed кэшируется."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.7, seed=42)
+
+        await provider.generate(prompt="Test", params=params)
+        await provider.generate(prompt="Test", params=params)
+
+        mock_acompletion.assert_called_once()
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_concurrent_identical_requests_share_one_call(self, mock_acompletion):
+        """Тестирует что параллельные одинаковые запросы ждут один вызов API."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        params = GenerationParams(temperature=0.0)
+
+        async def slow_completion(**_kwargs):
+            await asyncio.sleep(0.01)
+            return self._mock_response()
+
+        mock_acompletion.side_effect = slow_completion
+
+        first, second = await asyncio.gather(
+            provider.generate(prompt="Test", params=params),
+            provider.generate(prompt="Test", params=params),
+        )
+
+        mock_acompletion.assert_called_once()
+        assert first.text == second.text == "Cached"
+        assert second.extra["cache_hit"] is True
+        assert provider._inflight == {}
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_waiter_becomes_leader_after_failure(self, mock_acompletion):
+        """Тестирует что после ошибки лидера API вызывает только один ожидающий."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        params = GenerationParams(temperature=0.0)
+        calls = 0
+
+        async def flaky_completion(**_kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            if calls == 1:
+                raise ValueError("boom")
+            return self._mock_response()
+
+        mock_acompletion.side_effect = flaky_completion
+
+        results = await asyncio.gather(
+            *(provider.generate(prompt="Test", params=params) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert [r.text for r in results[1:]] == ["Cached", "Cached"]
+        assert mock_acompletion.call_count == 2
+        assert provider._inflight == {}
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_semantic_hit_is_shared_with_waiters(self, mock_acompletion):
+        """Тестирует что ожидающие получают семантический хит лидера без своего embedding."""
+        embed_calls = 0
+
+        async def embedder(text: str) -> list[float]:
+            nonlocal embed_calls
+            embed_calls += 1
+            await asyncio.sleep(0.01)
+            return [1.0, 0.0]
+
+        provider = LiteLLMProvider(model_name="gpt-4", semantic_embedder=embedder)
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.0)
+
+        await provider.generate(prompt="Capital of France?", params=params)
+        results = await asyncio.gather(
+            *(provider.generate(prompt="What is France's capital?", params=params) for _ in range(3)),
+        )
+
+        mock_acompletion.assert_called_once()
+        assert all(r.text == "Cached" for r in results)
+        assert embed_calls == 2
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_sampling_request_is_not_cached(self, mock_acompletion):
+        """Тестирует что запросы с temperature>0 не кэшируются."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        mock_acompletion.return_value = self._mock_response()
+
+        await provider.generate(prompt="Test")
+        await provider.generate(prompt="Test")
+
+        assert mock_acompletion.call_count == 2
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_cache_disabled(self, mock_acompletion):
+        """Тестирует что response_cache_size=0 отключает кэш."""
+        provider = LiteLLMProvider(model_name="gpt-4", response_cache_size=0)
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.0)
+
+        await provider.generate(prompt="Test", params=params)
+        await provider.generate(prompt="Test", params=params)
+
+        assert mock_acompletion.call_count == 2
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_semantic_cache_hit_for_similar_prompt(self, mock_acompletion):
+        """Тестирует что близкий по смыслу запрос обслуживается из семантического кэша."""
+        vectors = {"Capital of France?": [1.0, 0.0], "What is France's capital?": [0.99, 0.05]}
+
+        async def embedder(text: str) -> list[float]:
+            return vectors[text]
+
+        provider = LiteLLMProvider(model_name="gpt-4", semantic_embedder=embedder)
+        mock_acompletion.return_value = self._mock_response()
+        params = GenerationParams(temperature=0.0)
+
+        await provider.generate(prompt="Capital of France?", params=params)
+        result = await provider.generate(prompt="What is France's capital?", params=params)
+
+        assert result.text == "Cached"
+        mock_acompletion.assert_called_once()
+        assert provider.cache_stats["semantic_hits"] == 1
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_semantic_cache_embedder_error_is_a_miss(self, mock_acompletion):
+        """Тестирует что ошибка embedder'а не ломает генерацию."""
+
+        async def embedder(text: str) -> list[float]:
+            raise RuntimeError("VRAM exhausted")
+
+        provider = LiteLLMProvider(model_name="gpt-4", semantic_embedder=embedder)
+        mock_acompletion.return_value = self._mock_response()
+
+        result = await provider.generate(prompt="Test", params=GenerationParams(temperature=0.0))
+
+        assert result.text == "Cached"
+        mock_acompletion.assert_called_once()
+        assert provider._semantic_vectors is None
+
+
+@pytest.mark.asyncio
+class TestGenerateBatch:
+    """Тесты для generate_batch."""
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_batch_preserves_order(self, mock_acompletion):
+        """Тестирует что результаты возвращаются в порядке промптов."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        async def fake_acompletion(**kwargs):
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=kwargs["messages"][0]["content"]), finish_reason="stop")]
+            response.model = "gpt-4"
+            response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+            return response
+
+        mock_acompletion.side_effect = fake_acompletion
+
+        results = await provider.generate_batch(["a", "b", "c"])
+
+        assert [r.text for r in results] == ["a", "b", "c"]
+        assert mock_acompletion.call_count == 3
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_batch_identical_prompts_use_n(self, mock_acompletion):
+        """Тестирует что одинаковые промпты для OpenAI уходят одним запросом с n=."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        provider._llm_provider = "openai"
+
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=f"v{i}"), finish_reason="stop") for i in range(3)]
+        response.model = "gpt-4"
+        response.usage = Mock(prompt_tokens=3, completion_tokens=6, total_tokens=9)
+        mock_acompletion.return_value = response
+
+        results = await provider.generate_batch(["same"] * 3)
+
+        mock_acompletion.assert_called_once()
+        assert mock_acompletion.call_args.kwargs["n"] == 3
+        assert [r.text for r in results] == ["v0", "v1", "v2"]
+        assert sum(r.usage["total_tokens"] for r in results) == 9
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_batch_falls_back_when_n_is_capped(self, mock_acompletion):
+        """Тестирует что при урезанном n batch выполняется поштучно."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+        provider._llm_provider = "openai"
+
+        response = Mock()
+        response.choices = [Mock(message=Mock(content="v"), finish_reason="stop")]
+        response.model = "gpt-4"
+        response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        mock_acompletion.return_value = response
+
+        results = await provider.generate_batch(["same"] * 3)
+
+        assert len(results) == 3
+        # Один запрос с n=3 и три поштучных
+        assert mock_acompletion.call_count == 4
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_many_return_exceptions(self, mock_acompletion):
+        """Тестирует что ошибка одного запроса не прерывает остальные."""
+        provider = LiteLLMProvider(model_name="gpt-4", max_concurrency=2)
+
+        async def fake_acompletion(**kwargs):
+            content = kwargs["messages"][0]["content"]
+            if content == "bad":
+                raise ValueError("boom")
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=content), finish_reason="stop")]
+            response.model = "gpt-4"
+            response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+            return response
+
+        mock_acompletion.side_effect = fake_acompletion
+
+        results = await provider.generate_many(
+            [{"prompt": "ok"}, {"prompt": "bad"}],
+            return_exceptions=True,
+        )
+
+        assert results[0].text == "ok"
+        assert isinstance(results[1], RuntimeError)
+
+
 @pytest.mark.asyncio
 class TestGenerateStream:
     """Тесты для generate_stream."""
@@ -384,6 +739,56 @@ class TestGenerateStream:
         assert chunks[1].text == " world"
         assert chunks[2].finish_reason == "stop"
 
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_stream_uses_exact_usage(self, mock_acompletion):
+        """Тестирует что usage из отдельного финального chunk попадает в результат."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        async def mock_stream():
+            chunk1 = Mock()
+            chunk1.usage = None
+            chunk1.choices = [Mock(delta=Mock(content="Hello world"), finish_reason="stop")]
+
+            usage_chunk = Mock()
+            usage_chunk.usage = Mock(prompt_tokens=5, completion_tokens=2)
+            usage_chunk.choices = []
+
+            for chunk in [chunk1, usage_chunk]:
+                yield chunk
+
+        mock_acompletion.return_value = mock_stream()
+
+        chunks = [chunk async for chunk in provider.generate_stream(prompt="Test")]
+
+        assert len(chunks) == 1
+        assert chunks[0].text == "Hello world"
+        assert chunks[0].finish_reason == "stop"
+        assert chunks[0].usage == {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7, "cached_tokens": 0}
+        assert mock_acompletion.call_args.kwargs["stream_options"] == {"include_usage": True}
+
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_stream_coalesces_deltas(self, mock_acompletion):
+        """Тестирует склейку мелких дельт при включённом stream_coalesce_interval."""
+        provider = LiteLLMProvider(
+            model_name="gpt-4",
+            stream_coalesce_interval=60.0,
+            stream_coalesce_max_parts=2,
+        )
+
+        async def mock_stream():
+            for content, finish in [("a", None), ("b", None), ("c", None), ("d", "stop")]:
+                chunk = Mock()
+                chunk.usage = None
+                chunk.choices = [Mock(delta=Mock(content=content), finish_reason=finish)]
+                yield chunk
+
+        mock_acompletion.return_value = mock_stream()
+
+        chunks = [chunk async for chunk in provider.generate_stream(prompt="Test")]
+
+        assert [c.text for c in chunks] == ["ab", "cd"]
+        assert chunks[-1].finish_reason == "stop"
+
     @patch("src.providers.litellm_provider.acompletion")
     async def test_generate_stream_handles_error(self, mock_acompletion):
         """Тестирует обработку ошибки в streaming."""
@@ -397,6 +802,32 @@ class TestGenerateStream:
 
         assert "Ошибка LiteLLM stream" in str(exc_info.value)
 
+    @patch("src.providers.litellm_provider.acompletion")
+    async def test_generate_stream_closes_stream_on_early_exit(self, mock_acompletion):
+        """Тестирует что поток LiteLLM закрывается, если потребитель прервал чтение."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        class MockStream:
+            def __init__(self) -> None:
+                self.aclose = AsyncMock()
+
+            async def __aiter__(self):
+                for text in ["Hello", " world"]:
+                    chunk = Mock()
+                    chunk.usage = None
+                    chunk.choices = [Mock(delta=Mock(content=text), finish_reason=None)]
+                    yield chunk
+
+        stream = MockStream()
+        mock_acompletion.return_value = stream
+
+        generator = provider.generate_stream(prompt="Test")
+        first = await generator.__anext__()
+        await generator.aclose()
+
+        assert first.text == "Hello"
+        stream.aclose.assert_awaited_once()
+
 
 @pytest.mark.asyncio
 class TestGetModelInfo:
@@ -423,6 +854,15 @@ class TestGetModelInfo:
         assert info.context_window == 128000
         assert info.max_output_tokens == 4096
 
+    async def test_get_model_info_gpt4o_not_matched_as_gpt4(self):
+        """Тестирует что gpt-4o не попадает в запись для базового GPT-4."""
+        provider = LiteLLMProvider(model_name="gpt-4o-mini")
+
+        info = await provider.get_model_info()
+
+        assert info.context_window == 128000
+        assert info.max_output_tokens == 16384
+
     async def test_get_model_info_gpt35(self):
         """Тестирует информацию для GPT-3.5."""
         provider = LiteLLMProvider(model_name="gpt-3.5-turbo")
@@ -446,38 +886,90 @@ class TestHealthCheck:
     """Тесты для health_check."""
 
     @patch("src.providers.litellm_provider.acompletion")
-    async def test_health_check_success(self, mock_acompletion):
-        """Тестирует успешную health check."""
+    @patch("src.providers.litellm_provider.litellm.validate_environment")
+    async def test_health_check_success(self, mock_validate, mock_acompletion):
+        """Тестирует успешную health check без вызова генерации."""
         provider = LiteLLMProvider(model_name="gpt-4")
 
-        # Mock successful response
-        mock_response = Mock()
-        mock_choice = Mock()
-        mock_message = Mock()
-        mock_message.content = "Hi"
-        mock_choice.message = mock_message
-        mock_choice.finish_reason = "stop"
-        mock_response.choices = [mock_choice]
-        mock_response.model = "gpt-4"
-        mock_response.usage = Mock(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        mock_validate.return_value = {"keys_in_environment": True, "missing_keys": []}
 
-        mock_acompletion.return_value = mock_response
+        result = await provider.health_check()
+
+        assert result is True
+        mock_acompletion.assert_not_called()
+
+    @patch("src.providers.litellm_provider.litellm.validate_environment")
+    async def test_health_check_missing_keys(self, mock_validate):
+        """Тестирует неудачную health check при отсутствии ключей."""
+        provider = LiteLLMProvider(model_name="gpt-4")
+
+        mock_validate.return_value = {"keys_in_environment": False, "missing_keys": ["OPENAI_API_KEY"]}
+
+        result = await provider.health_check()
+
+        assert result is False
+
+    @patch("src.providers.litellm_provider.get_shared_http_client")
+    async def test_health_check_base_url_probes_models(self, mock_get_client):
+        """Тестирует что для base_url опрашивается /models с коротким таймаутом."""
+        provider = LiteLLMProvider(model_name="ollama/llama3", base_url="http://localhost:11434/")
+
+        # Ollama без /v1 отвечает 404 на /models: проверяется только доступность хоста
+        mock_client = Mock()
+        mock_client.get = AsyncMock(return_value=Mock(status_code=404))
+        mock_get_client.return_value = mock_client
 
         result = await provider.health_check()
 
         assert result is True
+        assert mock_client.get.call_args.args[0] == "http://localhost:11434/models"
+        assert mock_client.get.call_args.kwargs["timeout"] == DEFAULT_LITELLM_HEALTH_PROBE_TIMEOUT
 
-    @patch("src.providers.litellm_provider.acompletion")
-    async def test_health_check_failure(self, mock_acompletion):
+    @patch("src.providers.litellm_provider.get_shared_http_client")
+    async def test_health_check_base_url_status_codes(self, mock_get_client):
+        """Тестирует что 401/403 считаются ошибкой, а отсутствие /models - нет."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+
+        for status_code, expected in ((401, False), (403, False), (404, True), (405, True), (503, False)):
+            provider = LiteLLMProvider(model_name="gpt-4", base_url="http://localhost:8000")
+            mock_client.get = AsyncMock(return_value=Mock(status_code=status_code))
+
+            assert await provider.health_check() is expected, status_code
+
+    @patch("src.providers.litellm_provider.get_shared_http_client")
+    async def test_health_check_failure(self, mock_get_client):
         """Тестирует неудачную health check."""
-        provider = LiteLLMProvider(model_name="gpt-4")
+        provider = LiteLLMProvider(model_name="gpt-4", base_url="http://localhost:8000")
 
-        mock_acompletion.side_effect = Exception("Connection failed")
+        mock_client = Mock()
+        mock_client.get = AsyncMock(side_effect=Exception("Connection failed"))
+        mock_get_client.return_value = mock_client
 
         result = await provider.health_check()
 
         assert result is False
 
+    async def test_health_check_cached_within_ttl(self):
+        """Тестирует что повторная health check в пределах TTL не делает запрос."""
+        provider = LiteLLMProvider(model_name="gpt-4", health_ttl=60.0)
+
+        with patch.object(provider, "_probe_health", AsyncMock(side_effect=Exception("Connection failed"))) as probe:
+            assert await provider.health_check() is False
+            assert await provider.health_check() is False
+
+        assert probe.call_count == 1
+
+    async def test_health_check_not_cached_with_zero_ttl(self):
+        """Тестирует что при health_ttl=0 каждый вызов делает запрос."""
+        provider = LiteLLMProvider(model_name="gpt-4", health_ttl=0.0)
+
+        with patch.object(provider, "_probe_health", AsyncMock(side_effect=Exception("Connection failed"))) as probe:
+            await provider.health_check()
+            await provider.health_check()
+
+        assert probe.call_count == 2
+
 
 @pytest.mark.asyncio
 class TestCleanup:
@@ -1,6 +1,6 @@
 """Tests for ProviderRegistry with lazy loading."""
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -82,8 +82,8 @@ class TestProviderRegistryLazyLoading:
         mock_env_vars: None,
     ) -> None:
         """Test get_or_create creates provider from preset."""
-        # Mock LiteLLMProvider creation (imported inside _create_cloud_provider)
-        with patch("src.providers.litellm_provider.LiteLLMProvider") as mock_litellm:
+        # Mock LiteLLMProvider creation
+        with patch("src.providers.registry.LiteLLMProvider") as mock_litellm:
             mock_provider = MockLLMProvider(model_name="claude-sonnet-4-20250514")
             mock_litellm.return_value = mock_provider
 
@@ -99,7 +99,7 @@ class TestProviderRegistryLazyLoading:
         mock_env_vars: None,
     ) -> None:
         """Test get_or_create caches created provider."""
-        with patch("src.providers.litellm_provider.LiteLLMProvider") as mock_litellm:
+        with patch("src.providers.registry.LiteLLMProvider") as mock_litellm:
             mock_provider = MockLLMProvider(model_name="gpt-4-turbo")
             mock_litellm.return_value = mock_provider
 
@@ -111,6 +111,26 @@ class TestProviderRegistryLazyLoading:
             assert result1 is result2
             assert mock_litellm.call_count == 1  # Only created once
 
+    def test_get_or_create_wires_semantic_cache(
+        self,
+        provider_registry: ProviderRegistry,
+        mock_env_vars: None,
+    ) -> None:
+        """Test semantic cache embedder is passed when a model is configured."""
+        with (
+            patch("src.providers.registry.LiteLLMProvider") as mock_litellm,
+            patch("src.providers.registry.settings") as mock_settings,
+        ):
+            mock_settings.litellm_semantic_cache_model = "multilingual-e5-large"
+            mock_settings.litellm_semantic_cache_threshold = 0.9
+            mock_litellm.return_value = MockLLMProvider(model_name="gpt-4-turbo")
+
+            provider_registry.get_or_create("gpt-4-turbo")
+
+            kwargs = mock_litellm.call_args.kwargs
+            assert callable(kwargs["semantic_embedder"])
+            assert kwargs["semantic_threshold"] == 0.9
+
     def test_get_or_create_raises_for_unknown_preset(
         self,
         provider_registry: ProviderRegistry,
@@ -167,3 +187,19 @@ class TestProviderRegistryCleanup:
         assert "model-2" in info
         assert info["model-1"].name == "model-1"
         assert info["model-2"].name == "model-2"
+
+    @pytest.mark.asyncio
+    async def test_health_check_all_isolates_failures(
+        self,
+        provider_registry: ProviderRegistry,
+    ) -> None:
+        """Test a failing provider does not affect the others."""
+        healthy = MagicMock(health_check=AsyncMock(return_value=True))
+        broken = MagicMock(health_check=AsyncMock(side_effect=RuntimeError("boom")))
+
+        provider_registry.register("healthy", healthy)
+        provider_registry.register("broken", broken)
+
+        status = await provider_registry.health_check_all()
+
+        assert status == {"healthy": True, "broken": False}
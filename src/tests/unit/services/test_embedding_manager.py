@@ -1,10 +1,13 @@
-"""Tests for EmbeddingManager with FIFO eviction."""
+"""Tests for EmbeddingManager with LRU eviction of one-shot models first."""
 
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.core.model_presets import EmbeddingModelPreset
 from src.services.embedding_manager import (
+    DEFAULT_VRAM_REQUIREMENT_MB,
     EmbeddingManager,
     get_embedding_manager,
     set_embedding_manager,
@@ -37,6 +40,14 @@ class TestEmbeddingManagerInit:
         embedding_manager.set_vram_monitor(mock_vram_monitor)
         assert embedding_manager._vram_monitor is mock_vram_monitor
 
+    def test_vram_requirement_from_preset(self, embedding_manager: EmbeddingManager) -> None:
+        """Test VRAM requirement comes from preset with a default fallback."""
+        preset = EmbeddingModelPreset(name="m", huggingface_repo="mock/m", dimensions=8, vram_mb=2200)
+        assert embedding_manager._get_vram_requirement(preset) == 2200
+
+        preset = EmbeddingModelPreset(name="m", huggingface_repo="mock/m", dimensions=8)
+        assert embedding_manager._get_vram_requirement(preset) == DEFAULT_VRAM_REQUIREMENT_MB
+
 
 class TestEmbeddingManagerLazyLoading:
     """Tests for lazy loading functionality."""
@@ -80,6 +91,55 @@ class TestEmbeddingManagerLazyLoading:
             assert result1 is result2
             assert mock_provider_class.call_count == 1  # Only created once
 
+    @pytest.mark.asyncio
+    async def test_get_or_load_coalesces_concurrent_loads(
+        self,
+        embedding_manager: EmbeddingManager,
+    ) -> None:
+        """Test concurrent get_or_load for one model loads it only once."""
+
+        class SlowEmbeddingProvider(MockEmbeddingProvider):
+            async def load(self) -> None:
+                await asyncio.sleep(0.01)
+                await super().load()
+
+        with patch(
+            "src.services.embedding_manager.SentenceTransformerProvider"
+        ) as mock_provider_class:
+            mock_provider_class.side_effect = lambda *args, **kwargs: SlowEmbeddingProvider()
+
+            results = await asyncio.gather(
+                *(embedding_manager.get_or_load("multilingual-e5-large") for _ in range(3))
+            )
+
+            assert mock_provider_class.call_count == 1
+            assert results[0] is results[1] is results[2]
+            assert embedding_manager._loading == {}
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_load_error_reaches_all_waiters(
+        self,
+        embedding_manager: EmbeddingManager,
+    ) -> None:
+        """Test a failed load is attempted once and raised to every caller."""
+        load_calls = 0
+
+        async def failing_load(preset: object) -> None:
+            nonlocal load_calls
+            load_calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("CUDA out of memory")
+
+        with patch.object(embedding_manager, "_load_model", side_effect=failing_load):
+            results = await asyncio.gather(
+                *(embedding_manager.get_or_load("multilingual-e5-large") for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        assert load_calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert embedding_manager._loading == {}
+
     @pytest.mark.asyncio
     async def test_get_or_load_unknown_preset(
         self,
@@ -96,7 +156,7 @@ class TestEmbeddingManagerLazyLoading:
         self,
         embedding_manager: EmbeddingManager,
     ) -> None:
-        """Test get_or_load moves accessed model to end of FIFO queue."""
+        """Test get_or_load moves accessed model to end of LRU order."""
         with patch(
             "src.services.embedding_manager.SentenceTransformerProvider"
         ) as mock_provider_class:
@@ -114,15 +174,15 @@ class TestEmbeddingManagerLazyLoading:
             assert loaded[-1] == "multilingual-e5-large"
 
 
-class TestEmbeddingManagerFIFOEviction:
-    """Tests for FIFO eviction functionality."""
+class TestEmbeddingManagerEviction:
+    """Tests for eviction of one-shot models before reused ones."""
 
     @pytest.mark.asyncio
-    async def test_fifo_eviction_on_max_models(
+    async def test_eviction_on_max_models(
         self,
         mock_presets_loader: MockPresetsLoader,
     ) -> None:
-        """Test FIFO eviction when max_loaded_models is reached."""
+        """Test least recently used one-shot model is evicted at max_loaded_models."""
         # Add more presets for testing
         mock_presets_loader.add_embedding_preset("model-3", "mock/model-3", 512)
         mock_presets_loader.add_embedding_preset("model-4", "mock/model-4", 512)
@@ -162,11 +222,11 @@ class TestEmbeddingManagerFIFOEviction:
             assert providers[0]._cleaned_up  # First provider was cleaned up
 
     @pytest.mark.asyncio
-    async def test_fifo_eviction_with_vram_monitor(
+    async def test_eviction_with_vram_monitor(
         self,
         embedding_manager_with_vram: EmbeddingManager,
     ) -> None:
-        """Test FIFO eviction with VRAM monitoring."""
+        """Test eviction with VRAM monitoring."""
         # Set up VRAM monitor to deny allocation initially
         vram_monitor = embedding_manager_with_vram._vram_monitor
         vram_monitor.can_allocate.side_effect = [False, True]  # Deny first, then allow
@@ -188,6 +248,36 @@ class TestEmbeddingManagerFIFOEviction:
             assert "old-model" not in embedding_manager_with_vram.list_loaded()
             assert old_provider._cleaned_up
 
+    @pytest.mark.asyncio
+    async def test_eviction_prefers_cold_models(
+        self,
+        mock_presets_loader: MockPresetsLoader,
+    ) -> None:
+        """Test a reused model survives eviction of a one-shot model."""
+        mock_presets_loader.add_embedding_preset("model-3", "mock/model-3", 512)
+
+        manager = EmbeddingManager(
+            presets_loader=mock_presets_loader,  # type: ignore[arg-type]
+            device="cpu",
+            max_loaded_models=2,
+        )
+
+        with patch(
+            "src.services.embedding_manager.SentenceTransformerProvider"
+        ) as mock_provider_class:
+            mock_provider_class.side_effect = lambda *args, **kwargs: MockEmbeddingProvider()
+
+            await manager.get_or_load("multilingual-e5-large")
+            await manager.get_or_load("multilingual-e5-large")  # reuse -> hot
+            await manager.get_or_load("all-MiniLM-L6-v2")  # cold, most recent
+
+            # Pure LRU would evict multilingual-e5-large here
+            await manager.get_or_load("model-3")
+
+            loaded = manager.list_loaded()
+            assert "multilingual-e5-large" in loaded
+            assert "all-MiniLM-L6-v2" not in loaded
+
 
 class TestEmbeddingManagerCleanup:
     """Tests for cleanup functionality."""
@@ -14,16 +14,26 @@ def mock_redis() -> MagicMock:
     redis.hset = AsyncMock()
     redis.hgetall = AsyncMock(return_value={})
     redis.expire = AsyncMock()
-    redis.sadd = AsyncMock()
-    redis.srem = AsyncMock()
+    redis.zadd = AsyncMock()
+    redis.zrem = AsyncMock()
+    redis.zrevrange = AsyncMock(return_value=[])
     redis.smembers = AsyncMock(return_value=set())
     redis.exists = AsyncMock(return_value=1)
     redis.delete = AsyncMock()
+    redis.unlink = AsyncMock()
     redis.rpush = AsyncMock()
     redis.ltrim = AsyncMock()
     redis.lrange = AsyncMock(return_value=[])
     redis.llen = AsyncMock(return_value=0)
     redis.ping = AsyncMock()
+
+    # Pipeline: команды ставятся в очередь синхронно, execute() асинхронный
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[1, True, True, True])
+    redis.pipeline = MagicMock(return_value=pipe)
+
+    # Lua скрипт add_message: возвращает количество сообщений или -1
+    redis.register_script = MagicMock(return_value=AsyncMock(return_value=1))
     return redis
 
 
@@ -51,25 +61,27 @@ class TestConversationStore:
         assert conv_id.startswith("conv_")
         assert len(conv_id) == 17  # conv_ + 12 hex chars
 
-        # Проверяем что Redis методы вызваны
-        assert mock_redis.hset.call_count >= 1
-        assert mock_redis.expire.call_count >= 1
-        assert mock_redis.sadd.called  # Добавление в индекс
+        # Проверяем что все команды ушли одним pipeline
+        pipe = mock_redis.pipeline.return_value
+        assert pipe.hset.call_count == 1
+        assert pipe.expire.call_count >= 1
+        assert pipe.zadd.called  # Добавление в индекс
+        pipe.execute.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_create_conversation_with_system_prompt_adds_message(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест что системный промпт добавляется как первое сообщение."""
-        # При создании с system_prompt вызывается add_message
-        mock_redis.exists = AsyncMock(return_value=1)
-
         await conversation_store.create_conversation(
             system_prompt="System prompt",
         )
 
-        # Должен быть вызов rpush для добавления сообщения
-        assert mock_redis.rpush.called
+        # Сообщение добавляется в том же pipeline, без отдельного add_message
+        pipe = mock_redis.pipeline.return_value
+        assert pipe.rpush.called
+        assert pipe.hset.call_args[1]["mapping"]["message_count"] == "1"
+        mock_redis.exists.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_create_conversation_with_metadata(
@@ -81,8 +93,9 @@ class TestConversationStore:
         )
 
         # Проверяем что hset вызван
-        mock_redis.hset.assert_called()
-        call_args = mock_redis.hset.call_args
+        pipe = mock_redis.pipeline.return_value
+        pipe.hset.assert_called()
+        call_args = pipe.hset.call_args
         mapping = call_args[1]["mapping"]
         assert "metadata" in mapping
 
@@ -109,6 +122,43 @@ class TestConversationStore:
         assert conv["model"] == "claude-3.5-sonnet"
         assert conv["message_count"] == 5
 
+    @pytest.mark.asyncio
+    async def test_get_conversation_uses_meta_cache(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест что повторное чтение берётся из кэша, а запись его сбрасывает."""
+        mock_redis.hgetall = AsyncMock(
+            return_value={b"conversation_id": b"conv_abc123", b"message_count": b"1"}
+        )
+
+        await conversation_store.get_conversation("conv_abc123")
+        await conversation_store.get_conversation("conv_abc123")
+        assert mock_redis.hgetall.await_count == 1
+
+        await conversation_store.update_conversation("conv_abc123", model="gpt-4o")
+        await conversation_store.get_conversation("conv_abc123")
+        assert mock_redis.hgetall.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_meta_cache_returns_independent_metadata(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест что изменение вложенного metadata не портит кэш."""
+        mock_redis.hgetall = AsyncMock(
+            return_value={
+                b"conversation_id": b"conv_abc123",
+                b"message_count": b"0",
+                b"metadata": b'{"user_id": "u1"}',
+            }
+        )
+
+        conv = await conversation_store.get_conversation("conv_abc123")
+        conv["metadata"]["user_id"] = "changed"
+
+        cached = await conversation_store.get_conversation("conv_abc123")
+        assert cached["metadata"] == {"user_id": "u1"}
+        assert mock_redis.hgetall.await_count == 1
+
     @pytest.mark.asyncio
     async def test_get_conversation_not_found(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
@@ -125,20 +175,23 @@ class TestConversationStore:
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест удаления диалога."""
-        mock_redis.exists = AsyncMock(return_value=1)
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute = AsyncMock(return_value=[1, 1, 1])
 
         result = await conversation_store.delete_conversation("conv_abc123")
 
         assert result is True
-        mock_redis.delete.assert_called()
-        mock_redis.srem.assert_called()  # Удаление из индекса
+        assert pipe.unlink.call_count == 2
+        pipe.zrem.assert_called()  # Удаление из индекса
+        pipe.execute.assert_awaited_once()
+        mock_redis.exists.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_delete_conversation_not_found(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест удаления несуществующего диалога."""
-        mock_redis.exists = AsyncMock(return_value=0)
+        mock_redis.pipeline.return_value.execute = AsyncMock(return_value=[0, 0, 0])
 
         result = await conversation_store.delete_conversation("conv_nonexistent")
 
@@ -149,9 +202,6 @@ class TestConversationStore:
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест добавления сообщения в диалог."""
-        mock_redis.exists = AsyncMock(return_value=1)
-        mock_redis.llen = AsyncMock(return_value=1)
-
         result = await conversation_store.add_message(
             conversation_id="conv_abc123",
             role="user",
@@ -159,15 +209,20 @@ class TestConversationStore:
         )
 
         assert result is True
-        mock_redis.rpush.assert_called()
-        mock_redis.ltrim.assert_called()  # Ограничение размера
+        script = mock_redis.register_script.return_value
+        script.assert_awaited_once()
+        keys = script.call_args.kwargs["keys"]
+        args = script.call_args.kwargs["args"]
+        assert keys == ["conversation:conv_abc123", "conversation:conv_abc123:messages"]
+        assert args[1] == conversation_store.max_messages  # Ограничение размера
+        mock_redis.exists.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_add_message_to_nonexistent_conversation(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест добавления сообщения в несуществующий диалог."""
-        mock_redis.exists = AsyncMock(return_value=0)
+        mock_redis.register_script.return_value.return_value = -1
 
         result = await conversation_store.add_message(
             conversation_id="conv_nonexistent",
@@ -238,9 +293,6 @@ class TestConversationStore:
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест добавления полного turn (user + assistant)."""
-        mock_redis.exists = AsyncMock(return_value=1)
-        mock_redis.llen = AsyncMock(return_value=2)
-
         result = await conversation_store.add_turn(
             conversation_id="conv_abc123",
             user_message="What is Python?",
@@ -248,50 +300,98 @@ class TestConversationStore:
         )
 
         assert result is True
-        # Должно быть 2 вызова rpush (user + assistant)
-        assert mock_redis.rpush.call_count == 2
+        # Должно быть 2 вызова скрипта (user + assistant)
+        assert mock_redis.register_script.return_value.await_count == 2
 
     @pytest.mark.asyncio
     async def test_clear_messages(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест очистки истории сообщений."""
-        mock_redis.exists = AsyncMock(return_value=1)
-
         result = await conversation_store.clear_messages("conv_abc123")
 
         assert result is True
-        mock_redis.delete.assert_called()  # Удаление списка сообщений
-        mock_redis.hset.assert_called()  # Обновление message_count
+        # Удаление списка и обновление message_count одним скриптом
+        script = mock_redis.register_script.return_value
+        assert script.call_args.kwargs["keys"] == ["conversation:conv_abc123", "conversation:conv_abc123:messages"]
+        assert script.call_args.kwargs["args"][-2:] == ["message_count", "0"]
+        mock_redis.exists.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_list_conversations(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест получения списка диалогов."""
-        mock_redis.smembers = AsyncMock(
-            return_value={b"conv_abc123", b"conv_def456"}
+        mock_redis.zrevrange = AsyncMock(
+            return_value=[b"conv_def456", b"conv_abc123"]
         )
-        mock_redis.hgetall = AsyncMock(
-            return_value={
-                b"conversation_id": b"conv_abc123",
-                b"created_at": b"2024-01-01T00:00:00",
-                b"updated_at": b"2024-01-01T00:00:00",
-            }
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute = AsyncMock(
+            return_value=[
+                {
+                    b"conversation_id": b"conv_def456",
+                    b"created_at": b"2024-01-01T00:00:00",
+                    b"updated_at": b"2024-01-01T00:00:00",
+                },
+                {},  # Диалог истёк между ZREVRANGE и HGETALL
+            ]
         )
 
         conversations = await conversation_store.list_conversations(limit=10)
 
-        assert len(conversations) > 0
-        mock_redis.smembers.assert_called_once()
+        assert [c["conversation_id"] for c in conversations] == ["conv_def456"]
+        mock_redis.zrevrange.assert_awaited_once_with("conversations:index:created", 0, 9)
+        assert pipe.hgetall.call_count == 2
+        mock_redis.hgetall.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_index(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест переноса старого Set индекса в Sorted Set."""
+        mock_redis.smembers = AsyncMock(return_value={b"conv_abc123"})
+        mock_redis.pipeline.return_value.execute = AsyncMock(
+            return_value=[b"2024-01-01T00:00:00+00:00"]
+        )
+
+        migrated = await conversation_store.migrate_legacy_index()
+
+        assert migrated == 1
+        mock_redis.zadd.assert_awaited_once_with(
+            "conversations:index:created", {"conv_abc123": 1704067200.0}
+        )
+        mock_redis.unlink.assert_awaited_once_with("conversations:index")
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_index_skips_bad_created_at(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест что некорректный created_at не прерывает миграцию."""
+        mock_redis.smembers = AsyncMock(return_value={b"conv_abc123"})
+        mock_redis.pipeline.return_value.execute = AsyncMock(return_value=[b"not-a-date"])
+
+        migrated = await conversation_store.migrate_legacy_index()
+
+        assert migrated == 1
+        scores = mock_redis.zadd.call_args.args[1]
+        assert isinstance(scores["conv_abc123"], float)
+        mock_redis.unlink.assert_awaited_once_with("conversations:index")
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_index_noop(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест что без старого индекса миграция ничего не делает."""
+        migrated = await conversation_store.migrate_legacy_index()
+
+        assert migrated == 0
+        mock_redis.zadd.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_update_conversation(
         self, conversation_store: ConversationStore, mock_redis: MagicMock
     ) -> None:
         """Тест обновления метаданных диалога."""
-        mock_redis.exists = AsyncMock(return_value=1)
-
         result = await conversation_store.update_conversation(
             conversation_id="conv_abc123",
             model="gpt-4-turbo",
@@ -299,7 +399,22 @@ class TestConversationStore:
         )
 
         assert result is True
-        mock_redis.hset.assert_called()
+        script = mock_redis.register_script.return_value
+        assert script.call_args.kwargs["keys"] == ["conversation:conv_abc123"]
+        args = script.call_args.kwargs["args"]
+        assert args[args.index("model") + 1] == "gpt-4-turbo"
+        mock_redis.exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_update_conversation_not_found(
+        self, conversation_store: ConversationStore, mock_redis: MagicMock
+    ) -> None:
+        """Тест обновления несуществующего диалога."""
+        mock_redis.register_script.return_value.return_value = 0
+
+        result = await conversation_store.update_conversation("conv_nonexistent", model="gpt-4-turbo")
+
+        assert result is False
 
     @pytest.mark.asyncio
     async def test_health_check_success(